@@ -89,7 +89,7 @@ def _(mo, src):
     with mo.status.spinner(title="Creating comparison mode dropdowns...") as _: 
 
         # Mode1 
-        unique_masses = sorted({m for s in src.data.stars.sub_stages.ALL_SUBSTAGES_LIST for m in [s.mass_min, s.mass_max]})
+        unique_masses = src.data.stars.catalogue.get_catalogue().unique_masses
         mode1_massrange_options = [f"{unique_masses[i]:.1f}-{unique_masses[i+1]:.1f}" for i in range(len(unique_masses)-1)]
         mode1_massrange_dropdown = mo.ui.dropdown(mode1_massrange_options, value=next(iter(mode1_massrange_options)))
 
@@ -221,16 +221,10 @@ def _(
             available_substages = []
 
         elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_MASSFIRST: 
-            available_substages = src.misc.CustomList([
-                substage for substage in src.data.stars.sub_stages.ALL_SUBSTAGES_LIST 
-                if not (substage.mass_max <= selected_massrange[0] 
-                        or substage.mass_min >= selected_massrange[1])])
+            available_substages = src.data.stars.catalogue.get_catalogue().substages_for(mass_range=selected_massrange)
 
         elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_STAGEFIRST: 
-            available_substages = src.misc.CustomList([
-                substage for substage in src.data.stars.sub_stages.ALL_SUBSTAGES_LIST
-                if hasattr(substage.parent_stage, "id") and substage.parent_stage.id == selected_parentstage.id
-            ])
+            available_substages = src.data.stars.catalogue.get_catalogue().substages_for(parent_stage=selected_parentstage)
 
     return available_substages, selected_massrange, selected_parentstage
 
@@ -240,9 +234,7 @@ def _(
     available_substages,
     comparison_mode_radio,
     mo,
-    np,
     selected_massrange,
-    selected_parentstage,
     src,
 ):
     # Create available models 
@@ -253,35 +245,16 @@ def _(
             available_models = []
 
         elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_MASSFIRST: 
-            available_models = src.misc.CustomList(
-                [model for model in src.data.stars.MESA_models.ALL_MODELS_LIST 
-                 if model.mass<=selected_massrange[1] and model.mass>=selected_massrange[0]]) 
+            available_models = src.data.stars.catalogue.get_catalogue().models_in_mass_range(selected_massrange[0], selected_massrange[1]) 
 
 
         elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_STAGEFIRST: 
 
-            potential_models = src.misc.CustomList([
-                model for model in src.data.stars.MESA_models.ALL_MODELS_LIST
-                if hasattr(model.substage, "parent_stage")
-                and hasattr(model.substage.parent_stage, "id")
-                and model.substage.parent_stage.id == selected_parentstage.id ]) 
-
-            available_models = []
-            for substage in available_substages:
-
-                # Pick the model closest to the geometric center of this mass range 
-                models_in_stage = src.misc.CustomList([m for m in potential_models if m.substage.id == substage.id])
-                substage_geometric_center = np.sqrt(substage.mass_min*substage.mass_max)
-                if models_in_stage:
-
-                    closest_model = min(
-                        models_in_stage,
-                        key=lambda m: np.abs(np.log(m.mass) - np.log(substage_geometric_center))
-                    )                
-
-                    available_models.append(closest_model)
-
-            available_models = src.misc.CustomList(available_models)
+            # The model closest to the geometric center of each substage's mass range 
+            available_models = src.misc.CustomList([
+                src.data.stars.catalogue.get_catalogue().representative_model(substage) 
+                for substage in available_substages 
+                if src.data.stars.catalogue.get_catalogue().representative_model(substage) is not None]) 
 
 
 
@@ -328,31 +301,60 @@ def _(available_substages, comparison_mode_radio, mo, src):
 
 
 @app.cell(hide_code=True)
-def _(mo, src):
-    # Create history browser free selection mode 
+def _(mo, src, uploaded_folder):
+    # Create history browser free selection mode: a catalogue of every MESA data folder and what it was computed with 
+    # (from its input.txt/inlist, see src/mesa_io/run_metadata.py). The table can be searched and filtered by any column 
+    # Folders that can't be loaded (see src/mesa_io/catalogue_scan.py) are left out of the table and listed underneath it instead 
+    # Depends on uploaded_folder, so a newly uploaded folder shows up straight away 
+
+    with mo.status.spinner(title="Creating catalogue of MESA data folders...") as _: 
+
+        run_index = src.mesa_io.run_metadata.get_index(src.data.file_paths.MESA_data_folder) 
+        history_browser = mo.ui.table( 
+            [run.table_row() for run in run_index.runs()], 
+            selection="single", 
+            label="Select MESA data folder to be plotted...")
+
+        invalid_runs_note = "" 
+        if len(run_index.invalid_runs) > 0: 
+            invalid_runs_note = mo.md(
+                "Skipped folders that can't be loaded:\n\n" + 
+                "\n".join(f"- `{status.path}`: {'; '.join(status.problems)}" for status in run_index.invalid_runs)
+            )
+
 
-    with mo.status.spinner(title="Creating History data file browser...") as _: 
 
-        history_browser = mo.ui.file_browser( 
-            multiple=False, 
-            selection_mode="directory", 
-            restrict_navigation=True, 
-            label="Select MESA data folder to be plotted...", 
-            initial_path=src.data.file_paths.MESA_data_folder)
+    return history_browser, invalid_runs_note
 
 
+@app.cell(hide_code=True)
+def _(mo):
+    # Remember the profile selected in free selection mode, so it stays selected when a live run is refreshed 
+
+    get_free_modelnum, set_free_modelnum = mo.state(None) 
+
+    return get_free_modelnum, set_free_modelnum
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    # Switch between choosing one of the saved profiles (dropdown) and scrubbing through every model of the run (slider), 
+    # in free selection mode. Profiles between two saved ones are interpolated from them (see src/mesa_io/virtual_profile.py) 
+
+    interpolate_switch = mo.ui.switch(label="Scrub through every model (profiles between saved ones are interpolated)") 
 
-    return (history_browser,)
+    return (interpolate_switch,)
 
 
 @app.cell(hide_code=True)
-def _(history_selected, mo, src):
-    # Create profile dropdown for free selection mode 
+def _(get_free_modelnum, history_selected, mo, set_free_modelnum, src):
+    # Create profile dropdown and model slider for free selection mode 
 
     with mo.status.spinner(title="Creating Profile data dropdown selector...") as _: 
 
         if history_selected is not None: 
 
+            modelnums_available_ = list(history_selected.model_numbers_available) 
             profile_dropdown = src.data.marimo_ui_options.create_dropdown(
                 label="Profile selected: ", 
                 options_list = [
@@ -360,18 +362,32 @@ def _(history_selected, mo, src):
                         modelnum=modelnum_, 
                         age=history_selected.star_age[modelnum_-1], 
                         display=f"Modelnum={modelnum_}, Age={history_selected.age_strings[modelnum_-1]}") 
-                    for modelnum_ in history_selected.model_numbers_available]
+                    for modelnum_ in modelnums_available_], 
+                default_index = modelnums_available_.index(get_free_modelnum()) if get_free_modelnum() in modelnums_available_ else 0, 
+                on_change = lambda option: set_free_modelnum(option.modelnum) 
             )
 
+            # Slider over every model between the first and last saved profiles (there is nothing to interpolate between outside them) 
+            profile_slider = mo.ui.slider(
+                start=modelnums_available_[0], 
+                stop=modelnums_available_[-1], 
+                value=min(max(get_free_modelnum() or modelnums_available_[0], modelnums_available_[0]), modelnums_available_[-1]), 
+                label="Model number: ", 
+                show_value=True, 
+                full_width=True, 
+                on_change=set_free_modelnum 
+            ) if len(modelnums_available_) > 0 else None 
+
         else: 
             profile_dropdown = None  
+            profile_slider = None 
 
 
 
 
 
 
-    return (profile_dropdown,)
+    return profile_dropdown, profile_slider
 
 
 @app.cell(hide_code=True)
@@ -385,7 +401,17 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(Path, mo, src, uploaded_file, zipfile):
+def _(mo):
+    # Create refresh button for following a MESA run that is still being computed (free selection mode) 
+
+    with mo.status.spinner(title="Creating live run refresh button...") as _: 
+        live_refresh = mo.ui.refresh(options=["2s", "5s", "10s", "30s", "1m"]) 
+
+    return (live_refresh,)
+
+
+@app.cell(hide_code=True)
+def _(mo, src, uploaded_file):
     # Download the file uploaded using the file uploader 
 
 
@@ -395,55 +421,32 @@ def _(Path, mo, src, uploaded_file, zipfile):
         # No file uploaded yet
         if not uploaded_file.value:
             print("Error: no file uploaded") 
-            return 
+            return None
 
-        # Choose a target directory
+        # Extract the MESA files from the zip into a new folder (see src/mesa_io/ingest.py). 
+        # The zip is read member by member and checked before anything appears in target_dir 
         uploaded_zip_name = uploaded_file.name() # e.g. "mydata.zip"
-        uploaded_bytes = uploaded_file.contents() # bytes
-        download_zip_filepath = target_dir / uploaded_zip_name 
-
-
-
-        # Uploaded file is not a .zip folder 
-        if Path(uploaded_zip_name).suffix.lower() != ".zip": 
-            print("Error: filename must end in .zip (uploaded file should be a zipped MESA data folder)") 
-            return 
-
-        # File already downloaded 
-        if download_zip_filepath.with_suffix("").exists(): 
-            print(f"Error: {download_zip_filepath.with_suffix('')} already exists") 
-            return 
-
-
-
-        # Save the uploaded zip to the target directory 
-        with open(download_zip_filepath, "wb") as f:
-            f.write(uploaded_bytes)
-        print(f"Downloading zipped folder \'{uploaded_zip_name}\' to \'{download_zip_filepath}\'") 
-
-
-
-        # Unzip the folder 
-        with zipfile.ZipFile(download_zip_filepath, "r") as zf:
-            zf.extractall(target_dir) 
-        print(f"Extracting \'{download_zip_filepath}\' into \'{target_dir}\' folder")
-
-
+        print(f"Extracting zipped folder \'{uploaded_zip_name}\' into \'{target_dir}\' folder") 
+        try: 
+            folder, skipped = src.mesa_io.ingest.ingest_zip(uploaded_file.contents(), uploaded_zip_name, target_dir) 
+        except src.mesa_io.ingest.IngestError as e: 
+            print(f"Error: {e}") 
+            return None
 
-
-        # Delete the zipped folder (only keep the extracted data)
-        download_zip_filepath.unlink()
-        print(f"Deleting ZIP file '{download_zip_filepath}'") 
+        if len(skipped) > 0: 
+            print(f"Skipped {len(skipped)} non-MESA file(s): {', '.join(skipped[:5])}{' ...' if len(skipped) > 5 else ''}") 
+        print(f"Created MESA data folder \'{folder}\'") 
+        return folder 
 
 
 
 
     with mo.status.spinner(title="Downloading uploaded file...") as _: 
-        download_file(uploaded_file)
+        uploaded_folder = download_file(uploaded_file)
 
 
 
-    return
+    return (uploaded_folder,)
 
 
 @app.cell(hide_code=True)
@@ -452,8 +455,12 @@ def _(
     available_substages_tabs,
     comparison_mode_radio,
     history_browser,
+    interpolate_switch,
+    invalid_runs_note,
+    live_refresh,
     mo,
     profile_dropdown,
+    profile_slider,
     src,
     uploaded_file,
 ):
@@ -475,14 +482,18 @@ def _(
         if comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_FREE: 
 
             if profile_dropdown is not None: 
-                profile_dropdown_display = mo.vstack([f"File selected: \u200b \u200b \u200b \u200b \u200b {Path(history_browser.value[0].id)}", profile_dropdown]) 
+                profile_dropdown_display = mo.vstack([
+                    f"File selected: \u200b \u200b \u200b \u200b \u200b {Path(history_browser.value[0]['path'])}", 
+                    interpolate_switch, 
+                    profile_slider if interpolate_switch.value and profile_slider is not None else profile_dropdown]) 
             if profile_dropdown is None: 
                 profile_dropdown_display = ""
 
             model_selector = mo.vstack(
                 [
-                    mo.md("<h4>File Browser</h4>"), 
+                    mo.md("<h4>MESA Data Folders</h4>"), 
                     history_browser, 
+                    invalid_runs_note, 
                     mo.hstack(
                         [
                             "Upload your own MESA file:", 
@@ -493,7 +504,14 @@ def _(
                         gap=0.2, 
                         widths=[0.4, 0.2, 1]
                     ), 
-                    "(Don’t see your file? Try refreshing the File Browser.)", 
+                    mo.hstack(
+                        [
+                            "Run still being computed? Refresh to load new models:", 
+                            live_refresh
+                        ], 
+                        justify="start", 
+                        gap=0.2
+                    ), 
                     "\u200b", 
                     profile_dropdown_display
                 ], 
@@ -538,41 +556,53 @@ def _(
 
 
 @app.cell(hide_code=True)
-def _(available_models, mo, substage_selected):
-    # Identify model used to represent selected substage 
+def _(comparison_mode_radio, mo, selected_massrange, src, substage_selected):
+    # Identify model used to represent selected substage (a dictionary lookup, see src/data/stars/catalogue.py) 
 
     with mo.status.spinner(title="Finding model to represent selected substage...") as _: 
 
-        model_selected = next((model for model in available_models if model.substage == substage_selected), None)
+        if comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_MASSFIRST: 
+            model_selected = src.data.stars.catalogue.get_catalogue().representative_model(substage_selected, selected_massrange) 
+        elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_STAGEFIRST: 
+            model_selected = src.data.stars.catalogue.get_catalogue().representative_model(substage_selected) 
+        else: 
+            model_selected = None 
 
     return (model_selected,)
 
 
 @app.cell(hide_code=True)
-def _(
+async def _(
     Path,
     available_models,
     comparison_mode_radio,
     history_browser,
+    live_refresh,
     mo,
     model_selected,
     src,
 ):
     # Load selected history 
+    # Awaited rather than loaded in place, so the notebook stays responsive while the file is read (see load_data.load_history_async) 
 
     with mo.status.spinner(title="Loading MESA history file...") as _: 
 
         if model_selected is not None: 
-            history_selected = src.load_data.load_history(model_selected.MESA_folder_path)
+            history_selected = await src.load_data.load_history_async(model_selected.MESA_folder_path)
         elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_FREE: 
             if len(history_browser.value) > 0: 
-                history_selected = src.load_data.load_history(Path(history_browser.value[0].id))
+
+                # Once the live run refresh button has been used, pick up any models MESA has added since the last refresh 
+                if live_refresh.value: 
+                    src.load_data.refresh_run(Path(history_browser.value[0]['path'])) 
+
+                history_selected = await src.load_data.load_history_async(Path(history_browser.value[0]['path']))
             else: 
                 history_selected = None 
 
         # If we're in mode 1 and we're currently selecting the "no selection" tab, load the history from another tab and display it 
         elif comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_MASSFIRST: 
-            history_selected = src.load_data.load_history(available_models[0].MESA_folder_path)
+            history_selected = await src.load_data.load_history_async(available_models[0].MESA_folder_path)
         else: 
             history_selected = None
 
@@ -581,13 +611,15 @@ def _(
 
 
 @app.cell(hide_code=True)
-def _(
+async def _(
     Path,
     history_browser,
     history_selected,
+    interpolate_switch,
     mo,
     model_selected,
     profile_dropdown,
+    profile_slider,
     src,
 ):
     # Load selected profile and modelnum 
@@ -599,11 +631,19 @@ def _(
             if modelnum_selected is None: 
                 profile_selected = None 
             else: 
-                profile_selected = src.load_data.load_profile(model_selected.MESA_folder_path, modelnum_selected, history_selected) 
+                profile_selected = await src.load_data.load_profile_async(model_selected.MESA_folder_path, modelnum_selected, history_selected) 
+
+        # Any model, interpolated in time from the saved profiles on either side of it if it doesn't have one of its own 
+        elif interpolate_switch.value and profile_slider is not None and len(history_browser.value)>0: 
+            modelnum_selected = profile_slider.value 
+            profile_selected = src.load_data.load_virtual_profile(Path(history_browser.value[0]['path']), modelnum_selected, history_selected) 
 
         elif profile_dropdown is not None and profile_dropdown.value is not None and len(history_browser.value)>0: 
             modelnum_selected = profile_dropdown.value.modelnum 
-            profile_selected = src.load_data.load_profile(Path(history_browser.value[0].id), modelnum_selected, history_selected)
+            profile_selected = await src.load_data.load_profile_async(Path(history_browser.value[0]['path']), modelnum_selected, history_selected)
+
+            # Start loading the previous/next profiles in the background, so stepping through the dropdown is fast 
+            src.load_data.prefetch_neighboring_profiles(Path(history_browser.value[0]['path']), modelnum_selected, history_selected) 
 
         else: 
             modelnum_selected = None 
@@ -889,9 +929,11 @@ def _(
 
 
 @app.cell(hide_code=True)
-def _(
+async def _(
+    Path,
     available_models,
     comparison_mode_radio,
+    history_browser,
     history_plot_dropdown,
     history_selected,
     lru_cache,
@@ -932,6 +974,8 @@ def _(
 
                 hr.ax.set_title(f"Evolution of {model_selected.mass} $M_{{sun}}$ star across HR Diagram", fontsize=20, pad=50) 
 
+                # Collect every track first and add them all in one go (segments with the same style share one line, see src/plot/hr/tracks.py) 
+                segments = [] 
                 for index, model in enumerate(available_models): 
 
                     if model.substage.parent_stage is None: 
@@ -940,35 +984,27 @@ def _(
                     if model.model_start is None: 
                         continue 
 
-                    history = src.load_data.load_history(model.MESA_folder_path) 
+                    history = hr_histories[model.MESA_folder_path] 
 
                     # Selected substage: thicker linewidth with black border 
                     if model.id == model_selected.id: 
 
-                        # Black border 
-                        hr.add_path(
-                            history, 
-                            modelnum_start = model.model_start, 
-                            modelnum_end = model.model_end, 
-                            color = "black",  
-                            alpha = 1, 
-                            lw = 3 
-                        )
-
-                        hr.add_path(
+                        segments.append(src.plot.hr.tracks.TrackSegment(
                             history, 
                             modelnum_start = model.model_start, 
                             modelnum_end = model.model_end, 
                             color = model.substage.flowchart_color, 
                             label = f"{index}: {model.substage.mode1_abbrev}", 
                             alpha = 1, 
-                            lw = 2 
-                        )
+                            lw = 2, 
+                            outline = "black", 
+                            outline_lw = 3 
+                        ))
 
                     # "No selection" selected: apply thicker lines to all, but not black border 
                     elif model_selected.substage.parent_stage is None: 
 
-                        hr.add_path(
+                        segments.append(src.plot.hr.tracks.TrackSegment(
                             history, 
                             modelnum_start = model.model_start, 
                             modelnum_end = model.model_end, 
@@ -976,12 +1012,12 @@ def _(
                             label = f"{index}: {model.substage.mode1_abbrev}", 
                             alpha = 1, 
                             lw = 2 
-                        )
+                        ))
 
                     # Available for comparison but unselected substages: thinner linewidths 
                     else: 
 
-                        hr.add_path(
+                        segments.append(src.plot.hr.tracks.TrackSegment(
                             history, 
                             modelnum_start = model.model_start, 
                             modelnum_end = model.model_end, 
@@ -989,55 +1025,49 @@ def _(
                             label = f"{index}: {model.substage.mode1_abbrev}", 
                             alpha = 1, 
                             lw = 1 
-                        )
+                        ))
+
+                hr.add_paths(segments) 
 
             if comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_STAGEFIRST: 
 
                 hr.ax.set_title(f"Location of {model_selected.substage.parent_stage.full_name} on HR Diagram", fontsize=20, pad=50) 
 
+                segments = [] 
                 for model in available_models: 
 
                     if model.substage.parent_stage is None: 
                         continue 
 
                     # Add thin-linewidth tracks showing entire evolution 
-                    history = src.load_data.load_history(model.MESA_folder_path) 
-                    hr.add_path(
+                    history = hr_histories[model.MESA_folder_path] 
+                    segments.append(src.plot.hr.tracks.TrackSegment(
                         history, 
                         color = model.substage.flowchart_color, 
                         lw = 0.5, 
                         alpha = 0.8, 
                         label = f"{model.mass} $M_{{sun}}$"
-                    )
+                    ))
 
                     # Selected substage: thicker linewidth with black border 
                     if model.id == model_selected.id or model_selected.substage.parent_stage is None: 
 
-                        # Black border 
-                        hr.add_path(
-                            history, 
-                            modelnum_start = model.model_start, 
-                            modelnum_end = model.model_end, 
-                            color = "black",  
-                            alpha = 1, 
-                            lw = 3 
-                        )
-
-                        # Thick linewidth 
-                        hr.add_path(
+                        segments.append(src.plot.hr.tracks.TrackSegment(
                             history, 
                             modelnum_start = model.model_start, 
                             modelnum_end = model.model_end, 
                             color = model.substage.flowchart_color, 
                             label = f"{model.substage.mode2_abbrev}", 
                             alpha = 1, 
-                            lw = 2 
-                        )
+                            lw = 2, 
+                            outline = "black", 
+                            outline_lw = 3 
+                        ))
 
                     # Available for comparison but unselected substages: thicker linewidths but no black border 
                     else: 
 
-                        hr.add_path(
+                        segments.append(src.plot.hr.tracks.TrackSegment(
                             history, 
                             modelnum_start = model.model_start, 
                             modelnum_end = model.model_end, 
@@ -1045,7 +1075,9 @@ def _(
                             label = f"{model.substage.mode2_abbrev}", 
                             alpha = 1, 
                             lw = 2 
-                        )
+                        ))
+
+                hr.add_paths(segments) 
 
             if comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_FREE: 
                 hr.add_path(
@@ -1113,6 +1145,12 @@ def _(
                         history_selected, 
                         include_label=model.id==model_selected.id, ) 
 
+            # Highlight the stages of a freely selected run (found automatically from its history, see src/data/stars/stage_detection.py). 
+            # Runs missing the columns stage detection needs come back with no stages, and are left unhighlighted 
+            if comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_FREE and len(history_browser.value) > 0: 
+                for model in src.data.stars.stage_detection.detect_models(Path(history_browser.value[0]['path'])): 
+                    src.plot.history.add_substage_highlight(fig2, model, history_selected) 
+
             # Add model number labels (if in mode 4)
             if comparison_mode_radio.value == src.data.marimo_ui_options.COMPAREMODE_FREE: 
                 src.plot.history.add_model_labels_time(
@@ -1184,6 +1222,15 @@ def _(
 
     with mo.status.spinner(title="Drawing secondary plot...") as _: 
 
+        # The HR diagram of the mass-first and stage-first modes shows several runs: load all of their histories concurrently 
+        hr_histories = {} 
+        if plot_mode_radio.value == src.data.marimo_ui_options.PLOTMODE_HRDIAGRAM and comparison_mode_radio.value in [
+            src.data.marimo_ui_options.COMPAREMODE_MASSFIRST, 
+            src.data.marimo_ui_options.COMPAREMODE_STAGEFIRST 
+        ]: 
+            hr_histories = await src.load_data.load_histories_async(
+                [model.MESA_folder_path for model in available_models if model.substage.parent_stage is not None]) 
+
         secondary_plot = create_fig2() 
 
 
@@ -1213,7 +1260,6 @@ async def _():
         import os 
         import numpy as np 
         from pathlib import Path 
-        import zipfile
         from functools import lru_cache 
 
         import matplotlib.pyplot as plt
@@ -1227,6 +1273,11 @@ async def _():
 
         plt.style.use('default') # Make sure the plots appear with a white background, even if the user is in dark mode 
 
+    # Opt-in: with MESA_WARMUP=1 set, load every catalogued file into this server process's caches once, before the first session carries on (see src/warmup.py) 
+    with mo.status.spinner(title="Warming up caches...") as _: 
+        import src.warmup 
+        src.warmup.warm_up_from_env() 
+
 
     return (
         Path,
@@ -1238,7 +1289,6 @@ async def _():
         np,
         plt,
         src,
-        zipfile,
     )
 
 
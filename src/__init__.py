@@ -1,4 +1,5 @@
 from . import data 
 from . import plot 
 from . import load_data 
-from . import misc 
\ No newline at end of file
+from . import misc 
+from . import mesa_io 
\ No newline at end of file
@@ -0,0 +1,155 @@
+import sys
+import time
+
+import numpy as np
+
+from . import load_data
+from . import misc
+from .data import file_paths
+
+
+
+
+
+# Times the age strings load_history makes for the titles, against the per-model loop they replaced, and checks that both
+# give the same strings:
+#     python -m src.benchmark_age_strings [num_models ...]
+# Runs of 1000, 10000 and 100000 models (or num_models) with a profile saved at every model, the bundled 0.2 Msun run,
+# and NUM_RANDOM_CASES random runs with profiles saved at a random subset of models.
+NUM_MODELS = [1000, 10000, 100000]
+NUM_RANDOM_CASES = 300
+
+
+
+
+
+# The age strings as load_history used to make them, one saved model at a time. Kept as is to compare against
+def calc_age_strings_loop(star_age, model_numbers_available):
+    age_strings = [str(age) for age in star_age] # Initialize array
+    for ind in range(len(model_numbers_available)):
+
+        # current model
+        modelnum_current = model_numbers_available[ind]
+        age_current = star_age[modelnum_current-1]
+
+        # previous model
+        if ind == 0:
+            modelnum_previous = np.nan
+            age_previous = 0.0
+        else:
+            modelnum_previous = model_numbers_available[ind - 1]
+            age_previous = star_age[modelnum_previous-1]
+
+        # next model
+        if ind == len(model_numbers_available) - 1:
+            modelnum_next = np.nan
+            age_next = age_current*2
+        else:
+            modelnum_next = model_numbers_available[ind + 1]
+            age_next = star_age[modelnum_next-1]
+
+
+        num_sigfigs = np.max([len(str(age).replace(".", "")) for age in [age_previous, age_current, age_next]])
+
+
+        # Initialize
+        rounded_previous = misc.round_sigfigs(age_previous, num_sigfigs)
+        rounded_current = misc.round_sigfigs(age_current, num_sigfigs)
+        rounded_next = misc.round_sigfigs(age_next, num_sigfigs)
+
+        # Keep looping until rounding has gone too far, then take the previous iteration
+        while str(rounded_current) != str(rounded_previous) and str(rounded_current) != str(rounded_next):
+
+            age_previous = rounded_previous
+            age_current = rounded_current
+            age_next = rounded_next
+
+            rounded_previous = misc.round_sigfigs(age_previous, num_sigfigs)
+            rounded_current = misc.round_sigfigs(age_current, num_sigfigs)
+            rounded_next = misc.round_sigfigs(age_next, num_sigfigs)
+
+            num_sigfigs-=1
+
+            # Minimum of 4 sig figs
+            if num_sigfigs <= 2:
+                break
+
+
+        power = np.floor(np.log10(age_current))
+        if power == 12 or power == 13 or power == 14:
+            n = 12
+            suffix = " T years"
+        elif power == 9 or power == 10 or power == 11:
+            n = 9
+            suffix = " G years"
+        elif power == 6 or power == 7 or power == 8:
+            n = 6
+            suffix = " M years"
+        elif power == 3 or power == 4 or power == 5:
+            n = 3
+            suffix = " k years"
+        else:
+            n = 0
+            suffix = " years"
+
+
+        mantissa = misc.round_sigfigs(age_current / 10**n, num_sigfigs+2)
+        age_string_final = str(mantissa) + suffix
+        age_strings[modelnum_current-1] = age_string_final
+    return age_strings
+
+
+
+
+
+# Stand-in for a history's star_age: ages that grow by steps spread over a few orders of magnitude, as a run's timesteps do
+def synthetic_ages(num_models, rng):
+    steps = 10**rng.uniform(0, 6, num_models)
+    return 10**rng.uniform(0, 3) + np.cumsum(steps)
+
+
+
+# Ages and saved model numbers of a random run: up to 500 models, with a profile saved at a random subset of them
+def random_case(rng):
+    num_models = int(rng.integers(1, 500))
+    num_saved = int(rng.integers(1, num_models+1))
+    model_numbers_available = np.sort(rng.choice(np.arange(1, num_models+1), num_saved, replace=False))
+    return synthetic_ages(num_models, rng), model_numbers_available
+
+
+
+# Seconds each version takes on one run, and whether they made the same strings
+def compare(star_age, model_numbers_available):
+    start = time.perf_counter()
+    loop_strings = calc_age_strings_loop(star_age, model_numbers_available)
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized_strings = load_data.calc_age_strings(star_age, model_numbers_available)
+    vectorized_seconds = time.perf_counter() - start
+    return loop_seconds, vectorized_seconds, list(vectorized_strings) == loop_strings
+
+
+
+
+
+def print_report(num_models_list=NUM_MODELS, num_random_cases=NUM_RANDOM_CASES, file=sys.stdout):
+    rng = np.random.default_rng(0)
+    print(f"{'run':>12}{'loop (ms)':>14}{'vectorized (ms)':>18}{'same':>7}", file=file)
+    for num_models in num_models_list:
+        star_age = synthetic_ages(num_models, rng)
+        loop_seconds, vectorized_seconds, same = compare(star_age, np.arange(1, num_models+1))
+        print(f"{num_models:>12}{loop_seconds*1e3:>14.1f}{vectorized_seconds*1e3:>18.1f}{str(same):>7}", file=file)
+
+    history = load_data.load_history(file_paths.MESA_data_folder / "M=0.2")
+    loop_seconds, vectorized_seconds, same = compare(history.star_age, history.model_numbers_available)
+    print(f"{'M=0.2':>12}{loop_seconds*1e3:>14.1f}{vectorized_seconds*1e3:>18.1f}{str(same):>7}", file=file)
+
+    num_different = sum(not compare(*random_case(rng))[2] for _ in range(num_random_cases))
+    print(f"random runs: {num_random_cases - num_different} of {num_random_cases} the same", file=file)
+
+
+
+
+
+if __name__ == "__main__":
+    print_report([int(arg) for arg in sys.argv[1:]] or NUM_MODELS)
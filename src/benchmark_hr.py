@@ -0,0 +1,222 @@
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .data.stars import catalogue
+from .plot.hr import hr
+from .plot.hr import tracks
+
+
+
+
+
+# Times the HR diagram's work on every pan/zoom for synthetic runs of different sizes:
+#     python -m src.benchmark_hr [num_models ...]
+# Model number labels: runs of 100, 1000 and 10000 models (or num_models), every one of them with a saved profile.
+# Each pan moves the view by a few percent, which re-runs every xlim_changed/ylim_changed callback, as dragging the plot does.
+# The redraw itself isn't included. Spectral type labels: the same, for the labels along the top of the diagram.
+# Tracks: the time to redraw the tracks of a grid of runs after a pan, and how many lines are drawn, with one line per track or
+# batched (see plot/hr/tracks.py), for the segments the mass-first and stage-first HR diagrams make (colored by substage).
+# Level of detail: the time to redraw one long run, and how many vertices are drawn, at full detail or at the level of detail
+# picked for the view (see plot/hr/lod.py), zoomed out and zoomed in.
+NUM_MODELS = [100, 1000, 10000]
+NUM_PANS = 20
+
+# Track redraws: a grid of runs of TRACK_NUM_MODELS models each. The app shows one run per substage in the stage-first
+# diagram (14 in the catalogue), and a handful in the mass-first one; 50 is past what it draws
+NUM_RUNS = [1, 5, 14, 50]
+TRACK_NUM_MODELS = 2000
+TRACK_BRANCHES = ["mass-first", "stage-first"]
+
+# Level of detail: runs of LOD_NUM_MODELS models, with a smooth track (no jitter) as MESA's tracks are from model to model
+LOD_NUM_MODELS = [10000, 100000]
+LOD_ZOOM = 20 # Zoomed in view: this many times narrower (in log) than the full view, around the middle of the track
+
+
+
+
+
+# Stand-in for a history: a track that loops around the HR diagram, with a profile saved at every model.
+# A plain object rather than a SimpleNamespace, since the HR diagram keys per-history data on the history object itself.
+# jitter: standard deviation of random noise added to log_Teff
+class SyntheticHistory:
+    def __init__(self, **columns):
+        self.__dict__.update(columns)
+
+def synthetic_history(num_models, seed=0, jitter=0.002):
+    rng = np.random.default_rng(seed)
+    phase = np.linspace(0, 6*np.pi, num_models)
+    return SyntheticHistory(
+        log_Teff=3.7 + 0.25*np.sin(phase) + jitter*rng.standard_normal(num_models),
+        log_L=np.linspace(-3, 4, num_models) + 0.5*np.cos(phase),
+        model_numbers_available=np.arange(1, num_models+1))
+
+
+
+# Seconds per pan (average over num_pans) with model number labels on a run of num_models models
+def time_modelnum_labels(num_models, num_pans=NUM_PANS):
+    history = synthetic_history(num_models)
+    diagram = hr.HRDiagram()
+    diagram.fig.canvas.draw_idle = lambda: None # In the app the redraw happens later, once per event; only time the callbacks
+    diagram.add_path(history)
+    diagram.add_modelnum_labels(history, modelnum_now=num_models//2)
+
+    xlim = diagram.ax.get_xlim()
+    start = time.perf_counter()
+    for i in range(num_pans):
+        factor = 1 + 0.02*(i % 2 * 2 - 1) # Back and forth
+        diagram.ax.set_xlim(xlim[0]*factor, xlim[1]*factor)
+    seconds = (time.perf_counter() - start) / num_pans
+    plt.close(diagram.fig)
+    return seconds
+
+
+
+
+
+# Seconds per pan (average over num_pans) with the spectral type labels along the top of the diagram
+def time_spectral_labels(num_pans=NUM_PANS):
+    diagram = hr.HRDiagram()
+    diagram.fig.canvas.draw_idle = lambda: None
+    diagram.add_spectral_type_labels()
+
+    xlim = diagram.ax.get_xlim()
+    start = time.perf_counter()
+    for i in range(num_pans):
+        factor = 1 + 0.02*(i % 2 * 2 - 1)
+        diagram.ax.set_xlim(xlim[0]*factor, xlim[1]*factor)
+    seconds = (time.perf_counter() - start) / num_pans
+    plt.close(diagram.fig)
+    return seconds
+
+
+
+
+
+# The track segments create_fig2 in main.py makes for num_runs runs, each colored by its substage's flowchart color.
+# mass-first: every run split into one segment per substage, the first run's first substage selected (outlined), the others thin.
+# stage-first: one run per substage (cycling through them), each with a thin full track plus its substage highlighted,
+# outlined on the first run
+def app_segments(histories, branch, num_models):
+    colors = [substage.flowchart_color for substage in catalogue.get_catalogue().substages if substage.parent_stage is not None]
+    segments = []
+    if branch == "mass-first":
+        bounds = np.linspace(1, num_models, len(colors)+1).astype(int)
+        for i, history in enumerate(histories):
+            for j, color in enumerate(colors):
+                selected = i == 0 and j == 0
+                segments.append(tracks.TrackSegment(
+                    history, modelnum_start=bounds[j], modelnum_end=bounds[j+1], color=color, label=f"{i}: {j}",
+                    lw=2 if selected else 1, outline="black" if selected else None))
+    else:
+        for i, history in enumerate(histories):
+            color = colors[i % len(colors)]
+            segments.append(tracks.TrackSegment(history, color=color, lw=0.5, alpha=0.8, label=f"run {i}"))
+            segments.append(tracks.TrackSegment(
+                history, modelnum_start=num_models//4, modelnum_end=num_models//2, color=color, label=f"stage {i}",
+                lw=2, outline="black" if i == 0 else None))
+    return segments
+
+
+
+# (seconds per redraw, lines drawn) for the tracks of num_runs runs (average over num_pans pans), as made by app_segments.
+# batched: add them all with add_paths (one line per style), or else one add_path per segment, with the outline as a wider
+# black line underneath
+def time_track_redraw(num_runs, batched, branch, num_models=TRACK_NUM_MODELS, num_pans=NUM_PANS):
+    histories = [synthetic_history(num_models, seed=seed) for seed in range(num_runs)]
+    segments = app_segments(histories, branch, num_models)
+    diagram = hr.HRDiagram()
+    if batched:
+        diagram.add_paths(segments)
+    else:
+        for segment in segments:
+            stage = dict(modelnum_start=segment.modelnum_start, modelnum_end=segment.modelnum_end)
+            if segment.outline is not None:
+                diagram.add_path(segment.history, **stage, color=segment.outline, lw=segment.outline_lw)
+            diagram.add_path(segment.history, **stage, color=segment.color, lw=segment.lw, alpha=segment.alpha, label=segment.label)
+
+    diagram.fig.canvas.draw()
+    renderer = diagram.fig.canvas.get_renderer()
+    xlim = diagram.ax.get_xlim()
+    start = time.perf_counter()
+    for i in range(num_pans):
+        factor = 1 + 0.02*(i % 2 * 2 - 1)
+        diagram.ax.set_xlim(xlim[0]*factor, xlim[1]*factor)
+        for artist in diagram.lines:
+            artist.draw(renderer)
+    seconds = (time.perf_counter() - start) / num_pans
+    num_lines = len(diagram.lines)
+    plt.close(diagram.fig)
+    return seconds, num_lines
+
+
+
+
+
+# (seconds per redraw, vertices drawn) for one run of num_models models (average over num_pans pans).
+# lod: draw the level of detail picked for the view, or else always the full track. zoomed: zoomed in by LOD_ZOOM, or the full view
+def time_lod_redraw(num_models, lod, zoomed, num_pans=NUM_PANS):
+    history = synthetic_history(num_models, jitter=0)
+    diagram = hr.HRDiagram()
+    diagram.add_path(history)
+    if zoomed:
+        x_center, y_center = 10**history.log_Teff[num_models//2], 10**history.log_L[num_models//2]
+        x_span, y_span = [np.log10(max(lim)/min(lim)) / LOD_ZOOM for lim in [diagram.ax.get_xlim(), diagram.ax.get_ylim()]]
+        diagram.ax.set_xlim(x_center*10**(x_span/2), x_center/10**(x_span/2))
+        diagram.ax.set_ylim(y_center/10**(y_span/2), y_center*10**(y_span/2))
+    if not lod:
+        diagram._track_lods = []
+        for line in diagram.lines:
+            line.set_data(10**history.log_Teff[:-1], 10**history.log_L[:-1])
+
+    diagram.fig.canvas.draw()
+    renderer = diagram.fig.canvas.get_renderer()
+    xlim = diagram.ax.get_xlim()
+    start = time.perf_counter()
+    for i in range(num_pans):
+        factor = 1 + 0.02*(i % 2 * 2 - 1)
+        diagram.ax.set_xlim(xlim[0]*factor, xlim[1]*factor)
+        for artist in diagram.lines:
+            artist.draw(renderer)
+    seconds = (time.perf_counter() - start) / num_pans
+    vertices = sum(len(line.get_xdata()) for line in diagram.lines)
+    plt.close(diagram.fig)
+    return seconds, vertices
+
+
+
+
+
+def print_report(num_models_list=NUM_MODELS, num_runs_list=NUM_RUNS, lod_num_models_list=LOD_NUM_MODELS, file=sys.stdout):
+    print(f"{'models':>8}{'labels (ms/pan)':>18}", file=file)
+    for num_models in num_models_list:
+        print(f"{num_models:>8}{time_modelnum_labels(num_models)*1e3:>18.2f}", file=file)
+    print(f"spectral type labels (ms/pan): {time_spectral_labels()*1e3:.2f}", file=file)
+    print(file=file)
+
+    print(f"{'branch':>12}{'runs':>6}{'separate (ms/redraw)':>23}{'lines':>7}{'batched (ms/redraw)':>22}{'lines':>7}", file=file)
+    for branch in TRACK_BRANCHES:
+        for num_runs in num_runs_list:
+            separate_seconds, separate_lines = time_track_redraw(num_runs, batched=False, branch=branch)
+            batched_seconds, batched_lines = time_track_redraw(num_runs, batched=True, branch=branch)
+            print(f"{branch:>12}{num_runs:>6}{separate_seconds*1e3:>23.2f}{separate_lines:>7}{batched_seconds*1e3:>22.2f}{batched_lines:>7}", file=file)
+    print(file=file)
+
+    print(f"{'models':>8}{'view':>8}{'full (ms/redraw)':>19}{'vertices':>10}{'lod (ms/redraw)':>18}{'vertices':>10}", file=file)
+    for num_models in lod_num_models_list:
+        for zoomed in [False, True]:
+            full_seconds, full_vertices = time_lod_redraw(num_models, lod=False, zoomed=zoomed)
+            lod_seconds, lod_vertices = time_lod_redraw(num_models, lod=True, zoomed=zoomed)
+            view = "zoomed" if zoomed else "full"
+            print(f"{num_models:>8}{view:>8}{full_seconds*1e3:>19.2f}{full_vertices:>10}{lod_seconds*1e3:>18.2f}{lod_vertices:>10}", file=file)
+
+
+
+
+
+if __name__ == "__main__":
+    print_report([int(arg) for arg in sys.argv[1:]] or NUM_MODELS)
@@ -0,0 +1,165 @@
+from pathlib import Path
+
+import numpy as np
+import mesa_reader as mr
+
+from .data import isotopes
+from .data.stars import stage_detection
+from .mesa_io import binary_cache
+from .plot.profile import xaxis_options
+
+
+
+
+
+# Writes a compact copy of a MESA history file that only keeps the columns this app reads
+# (the same kind of file as the trimmed_history.data files bundled in MESA_data_folders), e.g.
+#     python -m src.compact_history path/to/history.data path/to/trimmed_history.data --rtol 1e-3
+# Values are copied over as the exact text from the original file, so nothing is lost to reformatting.
+# With --rtol, rows are also thinned out: a row is dropped if linear interpolation between the rows that are kept
+# reproduces every column to within rtol of that column's full range. A thinned file is marked in its header
+# (binary_cache.THINNED_HEADER_NAME), and the app fills the dropped model numbers back in by the same interpolation
+# when it loads the file (see mesa_io/binary_cache.densify_model_numbers).
+# Model numbers that have a saved profile (from profiles.index next to the history) are always kept.
+
+
+
+
+
+# Columns read directly from the history by the app: main.py, plot/history.py and plot/hr (plots, titles, HR diagram).
+# Add to this whenever one of them starts reading another history column
+FIXED_HISTORY_COLUMNS = [
+    "model_number", "star_age", "star_mass",
+    "log_L", "log_Teff", "log_R",
+    "log_LH", "log_LHe", "log_LZ",
+]
+
+
+
+# Every history column the app uses, including the ones stage detection reads (data/stars/stage_detection.py)
+def history_columns():
+    columns = FIXED_HISTORY_COLUMNS + stage_detection.DETECTION_COLUMNS
+    for plot_items in [isotopes.ISOTOPES, isotopes.FUSION_RATES, isotopes.CONVECTIONS]:
+        columns += [item.history_key for item in plot_items if item.history_key is not None]
+    for xaxis in xaxis_options.PROFILEXAXIS_OPTIONS:
+        columns += xaxis.core_strings
+    return list(dict.fromkeys(columns)) # Remove duplicates, keeping order
+
+
+
+
+
+# Indices of the rows to keep so that linear interpolation in x (model number) between kept rows reproduces every
+# column of values (shape (num_columns, num_rows)) to within tolerance[column]. Rows in always_keep are never dropped.
+# Greedy: starting from the last kept row, extend the segment one row at a time until some row inside it would be
+# off by more than the tolerance, then keep the row before that.
+def thin_rows(x, values, tolerance, always_keep=()):
+    num_rows = len(x)
+    if num_rows <= 2:
+        return np.arange(num_rows)
+
+    forced = np.zeros(num_rows, dtype=bool)
+    forced[[i for i in always_keep if 0 <= i < num_rows]] = True
+    forced[[0, -1]] = True
+    tolerance = np.asarray(tolerance)[:, None]
+
+    keep = [0]
+    start = 0
+    while start < num_rows-1:
+        end = start+1
+        while end+1 < num_rows and not forced[end]:
+            candidate = end+1
+            inside = slice(start+1, candidate)
+            fraction = (x[inside] - x[start]) / (x[candidate] - x[start])
+            interpolated = values[:, start, None] + fraction * (values[:, candidate, None] - values[:, start, None])
+            if np.any(np.abs(interpolated - values[:, inside]) > tolerance):
+                break
+            end = candidate
+        keep.append(end)
+        start = end
+    return np.array(keep)
+
+
+
+
+
+# Model numbers with a saved profile, from the profiles.index next to the history file (empty if there isn't one)
+def profile_model_numbers(history_path):
+    index_path = Path(history_path).parent / "profiles.index"
+    if not index_path.is_file():
+        return np.array([], dtype=int)
+    return np.asarray(mr.MesaProfileIndex(str(index_path)).model_numbers)
+
+
+
+
+
+# Write the compacted copy of history_path to output_path. Returns (number of columns kept, number of rows kept, number of rows in the original).
+# Rows left behind by backups/restarts are always dropped.
+# columns: columns to keep (default: history_columns()); ones the file doesn't have are ignored.
+# rtol: if given, thin the rows to this relative error bound (see above).
+# keep_model_numbers: extra model numbers to keep when thinning (on top of the ones with saved profiles)
+def compact_history(history_path, output_path, columns=None, rtol=None, keep_model_numbers=()):
+    history_path = Path(history_path)
+    output_path = Path(output_path)
+    if columns is None:
+        columns = history_columns()
+
+    with open(history_path, "r") as f:
+        lines = f.readlines()
+    names_line = mr.MesaData.bulk_names_line # 1-based line number of the column names; data starts on the next line
+    bulk_names = lines[names_line-1].split()
+    kept_names = [name for name in bulk_names if name in columns]
+    kept_indices = [bulk_names.index(name) for name in kept_names]
+    data_lines = [line for line in lines[names_line:] if line.strip()]
+
+    # Drop rows left behind by backups/restarts, same rule as mr.MesaData.remove_backups:
+    # a row is only kept if its model number is smaller than every model number after it
+    model_number_index = bulk_names.index("model_number")
+    all_model_numbers = np.array([int(float(line.split()[model_number_index])) for line in data_lines])
+    later_min = np.minimum.accumulate(all_model_numbers[::-1])[::-1]
+    rows = np.append(np.flatnonzero(all_model_numbers[:-1] < later_min[1:]), len(data_lines)-1)
+
+    if rtol is not None:
+        history = mr.MesaData(str(history_path)) # Same rows as "rows" above, since mesa_reader drops the same backups
+        model_numbers = history.model_number
+        values = np.array([history.data(name) for name in kept_names], dtype=float)
+        tolerance = rtol * (np.nanmax(values, axis=1) - np.nanmin(values, axis=1))
+        protected = np.concatenate([profile_model_numbers(history_path), np.asarray(keep_model_numbers, dtype=int)])
+        always_keep = np.flatnonzero(np.isin(model_numbers, protected))
+        rows = rows[thin_rows(model_numbers, values, tolerance, always_keep)]
+
+    with open(output_path, "w") as f:
+        if rtol is None:
+            f.writelines(lines[:names_line-2]) # Header block, copied as-is
+        else:
+            # Header block, plus the marker that tells the app to fill the dropped rows back in
+            header_names = lines[names_line-5].split() + [binary_cache.THINNED_HEADER_NAME]
+            f.write(" ".join(str(i+1) for i in range(len(header_names))) + "\n")
+            f.write(" ".join(header_names) + "\n")
+            f.write(lines[names_line-4].rstrip("\n") + f" {rtol!r}\n")
+            f.writelines(lines[names_line-3:names_line-2])
+        f.write(" ".join(str(i+1) for i in range(len(kept_names))) + "\n")
+        f.write(" ".join(kept_names) + "\n")
+        for row in rows:
+            tokens = data_lines[row].split()
+            f.write(" ".join(tokens[i] for i in kept_indices) + "\n")
+
+    return len(kept_names), len(rows), len(data_lines)
+
+
+
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a copy of a MESA history file with only the columns this app uses.")
+    parser.add_argument("history", help="MESA history file (e.g. LOGS/history.data)")
+    parser.add_argument("output", help="where to write the compacted history (e.g. trimmed_history.data)")
+    parser.add_argument("--rtol", type=float, default=None, help="also drop rows that linear interpolation reproduces to within this fraction of each column's range")
+    parser.add_argument("--keep", type=int, nargs="*", default=[], help="model numbers to always keep when thinning rows")
+    args = parser.parse_args()
+
+    num_columns, num_rows, num_rows_original = compact_history(args.history, args.output, rtol=args.rtol, keep_model_numbers=args.keep)
+    size_in, size_out = Path(args.history).stat().st_size, Path(args.output).stat().st_size
+    print(f"{num_columns} columns, {num_rows}/{num_rows_original} rows, {size_in/1024:.0f} kB -> {size_out/1024:.0f} kB")
@@ -220,9 +220,9 @@ class AvailableModelnumsOption(base_option.BaseOption):
 
 
 # Using a list of options defined above, create a Marimo dropdown or radio selector 
-def create_dropdown(options_list, default_index=0, label=""):
+def create_dropdown(options_list, default_index=0, label="", on_change=None):
     options_dict = {opt.display: opt for opt in options_list} 
-    dropdown = mo.ui.dropdown(options=options_dict, value=list(options_dict.keys())[default_index], label=label) 
+    dropdown = mo.ui.dropdown(options=options_dict, value=list(options_dict.keys())[default_index], label=label, on_change=on_change) 
     return dropdown 
 
 def create_radio(options_list, default_index=0):
@@ -1,4 +1,6 @@
 from . import base_class 
 from . import MESA_models 
+from . import catalogue 
 from . import parent_stages 
-from . import sub_stages 
\ No newline at end of file
+from . import sub_stages 
+from . import stage_detection 
\ No newline at end of file
@@ -4,8 +4,10 @@ from dataclasses import dataclass
 
 
 
-# Base class that gives ParentStage, SubStage, and Model classes a __str__ and __repr__ function (so they print their ID's)
-@dataclass
+# Base class that gives ParentStage, SubStage, and Model classes a __str__ and __repr__ function (so they print their ID's). 
+# Entities are frozen and slotted, and compare/hash by ID, so they can be dict keys and set members and lookups 
+# don't compare every field. Subclasses set "id" once, in __post_init__ (through object.__setattr__, since they are frozen) 
+@dataclass(frozen=True, slots=True, eq=False)
 class BaseEntity:
     def __str__(self):
         return getattr(self, 'id', f"{self.__class__.__name__}()")
@@ -13,5 +15,11 @@ class BaseEntity:
     def __repr__(self):
         return self.__str__()
 
+    def __eq__(self, other):
+        return type(other) is type(self) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
 
 
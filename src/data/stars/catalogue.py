@@ -0,0 +1,209 @@
+import bisect
+import json
+import math
+from dataclasses import fields
+from functools import lru_cache
+from pathlib import Path
+from . import MESA_models
+from . import parent_stages
+from . import sub_stages
+from .. import file_paths
+from ... import misc
+
+
+
+
+
+# The substages and hand-tuned models live in catalogue.json rather than in code, so the catalogue can grow
+# (e.g. a grid of hundreds of masses) without code edits and without slowing down import.
+# It is only read the first time something asks for it (sub_stages.SUB_x / ALL_SUBSTAGES_LIST, MESA_models.MODEL_x /
+# ALL_MODELS_LIST, or get_catalogue()), and is checked as it is read.
+# Layout:
+#     "substages": {"SUB_x": {the SubStage fields, with parent_stage given as the name of a parent_stages.PARENT_x constant}, ...}
+#     "models":    {"MODEL_x": {"mass", "substage" (a SUB_x name), "model_start", "model_example", "model_end",
+#                               "folder" (relative to file_paths.MESA_data_folder)}, ...}
+# Substages and models keep the order they have in the file.
+CATALOGUE_PATH = Path(__file__).parent/"catalogue.json"
+CATALOGUE_FORMAT_VERSION = 1
+
+MODEL_FIELDS = ["mass", "substage", "model_start", "model_example", "model_end", "folder"]
+
+
+
+
+
+class CatalogueError(ValueError):
+    pass
+
+
+
+
+
+class Catalogue:
+
+    def __init__(self, substages, models):
+        self.substages_by_name = substages # "SUB_x" -> SubStage
+        self.models_by_name = models # "MODEL_x" -> MESA_model
+
+        # Views, in file order
+        self.substages = misc.CustomList(substages.values())
+        self.models = misc.CustomList(models.values())
+
+        # Indexes. Entities hash by ID (see base_class.py), so they can be used as keys directly
+        self.by_id = {entity.id: entity for entity in [*parent_stages.ALL_PARENTSTAGES_LIST, *self.substages, *self.models]}
+        self._models_by_mass = {}
+        self._models_by_substage = {}
+        self._models_by_parent_stage = {}
+        self._model_by_mass_and_substage = {}
+        self._substages_by_parent_stage = {}
+        for model in self.models:
+            self._models_by_mass.setdefault(model.mass, misc.CustomList()).append(model)
+            self._models_by_substage.setdefault(model.substage, misc.CustomList()).append(model)
+            self._model_by_mass_and_substage.setdefault((model.mass, model.substage), model)
+            if model.substage.parent_stage is not None:
+                self._models_by_parent_stage.setdefault(model.substage.parent_stage, misc.CustomList()).append(model)
+        for substage in self.substages:
+            if substage.parent_stage is not None:
+                self._substages_by_parent_stage.setdefault(substage.parent_stage, misc.CustomList()).append(substage)
+        self.masses = sorted(self._models_by_mass)
+
+        # Edges of the mass ranges the substages are defined over (the mass axis of the flowchart)
+        self.unique_masses = sorted({m for substage in self.substages for m in [substage.mass_min, substage.mass_max]})
+
+        # Filled in on first use, since the mass ranges asked for aren't known in advance
+        self._substages_by_parent_stage_and_mass_range = {}
+        self._representative_models = {}
+
+
+
+    def models_for_mass(self, mass):
+        return self._models_by_mass.get(mass, misc.CustomList())
+
+
+
+    # Models with mass_min <= mass <= mass_max, in file order
+    def models_in_mass_range(self, mass_min, mass_max):
+        masses = self.masses[bisect.bisect_left(self.masses, mass_min) : bisect.bisect_right(self.masses, mass_max)]
+        return misc.CustomList(model for mass in masses for model in self._models_by_mass[mass])
+
+
+
+    def models_for_substage(self, substage):
+        return self._models_by_substage.get(substage, misc.CustomList())
+
+
+
+    def models_for_parent_stage(self, parent_stage):
+        return self._models_by_parent_stage.get(parent_stage, misc.CustomList())
+
+
+
+    def model_for(self, mass, substage):
+        return self._model_by_mass_and_substage.get((mass, substage))
+
+
+
+    def substages_for_parent_stage(self, parent_stage):
+        return self._substages_by_parent_stage.get(parent_stage, misc.CustomList())
+
+
+
+    # Substages of parent_stage (any, if None) whose mass range overlaps mass_range=(mass_min, mass_max) (any, if None)
+    def substages_for(self, parent_stage=None, mass_range=None):
+        mass_range = None if mass_range is None else tuple(mass_range)
+        key = (parent_stage, mass_range)
+        if key not in self._substages_by_parent_stage_and_mass_range:
+            substages = self.substages if parent_stage is None else self.substages_for_parent_stage(parent_stage)
+            if mass_range is not None:
+                substages = [substage for substage in substages if not (substage.mass_max <= mass_range[0] or substage.mass_min >= mass_range[1])]
+            self._substages_by_parent_stage_and_mass_range[key] = misc.CustomList(substages)
+        return self._substages_by_parent_stage_and_mass_range[key]
+
+
+
+    # The model shown for a substage.
+    # With a mass_range (choosing a mass first): the lowest-mass model in that range that goes through the substage.
+    # Without one (choosing a stage first): the model closest to the geometric center of the substage's mass range
+    def representative_model(self, substage, mass_range=None):
+        if substage is None:
+            return None
+        mass_range = None if mass_range is None else tuple(mass_range)
+        key = (substage, mass_range)
+        if key not in self._representative_models:
+            if mass_range is not None:
+                model = next((model for model in self.models_in_mass_range(*mass_range) if model.substage == substage), None)
+            else:
+                models = self.models_for_substage(substage)
+                substage_geometric_center = math.sqrt(substage.mass_min*substage.mass_max)
+                model = min(models, key=lambda m: abs(math.log(m.mass) - math.log(substage_geometric_center))) if models else None
+            self._representative_models[key] = model
+        return self._representative_models[key]
+
+
+
+
+
+def _check_fields(kind, name, entry, expected):
+    if not isinstance(entry, dict):
+        raise CatalogueError(f"{kind} {name}: expected an object, got {type(entry).__name__}")
+    missing = [key for key in expected if key not in entry]
+    unknown = [key for key in entry if key not in expected]
+    if missing or unknown:
+        raise CatalogueError(f"{kind} {name}: missing fields {missing}, unknown fields {unknown}")
+
+
+
+def _parse_substage(name, entry):
+    expected = [f.name for f in fields(sub_stages.SubStage) if f.init]
+    _check_fields("Substage", name, entry, expected)
+    parent_stage = entry["parent_stage"]
+    if parent_stage is not None:
+        parent_stage = getattr(parent_stages, parent_stage, None)
+        if not isinstance(parent_stage, parent_stages.ParentStage):
+            raise CatalogueError(f"Substage {name}: unknown parent stage {entry['parent_stage']!r}")
+    if not entry["mass_min"] <= entry["mass_max"]:
+        raise CatalogueError(f"Substage {name}: mass_min {entry['mass_min']} is above mass_max {entry['mass_max']}")
+    return sub_stages.SubStage(**{**entry, "parent_stage": parent_stage})
+
+
+
+def _parse_model(name, entry, substages):
+    _check_fields("Model", name, entry, MODEL_FIELDS)
+    if entry["substage"] not in substages:
+        raise CatalogueError(f"Model {name}: unknown substage {entry['substage']!r}")
+    substage = substages[entry["substage"]]
+    if not substage.mass_min <= entry["mass"] <= substage.mass_max:
+        raise CatalogueError(f"Model {name}: mass {entry['mass']} is outside the mass range of {entry['substage']} ({substage.mass_min}-{substage.mass_max})")
+    model_numbers = [entry[key] for key in ["model_start", "model_example", "model_end"] if entry[key] is not None]
+    if any(not isinstance(num, int) or num < 1 for num in model_numbers):
+        raise CatalogueError(f"Model {name}: model numbers must be positive integers")
+    if entry["model_start"] is not None and entry["model_end"] is not None and entry["model_start"] > entry["model_end"]:
+        raise CatalogueError(f"Model {name}: model_start {entry['model_start']} is after model_end {entry['model_end']}")
+    return MESA_models.MESA_model(
+        mass=entry["mass"],
+        substage=substage,
+        model_start=entry["model_start"],
+        model_example=entry["model_example"],
+        model_end=entry["model_end"],
+        MESA_folder_path=file_paths.MESA_data_folder/entry["folder"])
+
+
+
+# Read and check a catalogue file. Raises CatalogueError (naming the bad entry) if anything in it is wrong
+def load_catalogue(path=CATALOGUE_PATH):
+    with open(path, "r") as f:
+        saved = json.load(f)
+    if saved.get("format_version") != CATALOGUE_FORMAT_VERSION:
+        raise CatalogueError(f"{path}: unsupported format version {saved.get('format_version')!r}")
+    substages = {name: _parse_substage(name, entry) for name, entry in saved["substages"].items()}
+    models = {name: _parse_model(name, entry, substages) for name, entry in saved["models"].items()}
+    return Catalogue(substages, models)
+
+
+
+
+
+# The catalogue shipped with the app, read on first use
+@lru_cache(maxsize=1)
+def get_catalogue():
+    return load_catalogue()
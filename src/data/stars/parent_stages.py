@@ -1,4 +1,4 @@
-from dataclasses import dataclass 
+from dataclasses import dataclass, field 
 from . import base_class 
 from ... import misc 
 
@@ -7,15 +7,16 @@ from ... import misc
 ################################################################################
 
 
-@dataclass 
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class ParentStage(base_class.BaseEntity):
     flowchart_x: int 
     short_name: str 
     full_name: str 
+    id: str = field(init=False) # Set in __post_init__ 
 
     # Automatically generate ID when object is created
     def __post_init__(self):
-        self.id = f"ParentStage({self.short_name}, x={self.flowchart_x})"
+        object.__setattr__(self, 'id', f"ParentStage({self.short_name}, x={self.flowchart_x})")
 
 
 ################################################################################
@@ -0,0 +1,249 @@
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from . import MESA_models
+from . import catalogue
+from . import parent_stages
+from . import sub_stages
+from ... import load_data
+from ... import misc
+from ...mesa_io import mesa_folder
+
+
+
+
+
+# Finds where each evolutionary stage of a MESA run starts, from its history alone, so runs that aren't in the
+# hand-tuned catalogue (catalogue.json), e.g. uploaded ones, still get stage highlighting.
+# Each boundary is one vectorised pass over a few history columns:
+#     Henyey:       minimum of log_L before the ZAMS, if log_Teff then rises by at least HENYEY_MIN_DLOG_TEFF (otherwise there is no Henyey track)
+#     ZAMS:         hydrogen burning first supplies ZAMS_LH_FRACTION of the luminosity
+#     TAMS:         center_h1 drops below TAMS_CENTER_H1
+#     RG:           the knee of the track in the HR diagram between the TAMS and the RGB tip (furthest point from the straight line joining them)
+#     RGB tip:      maximum of log_L between the TAMS and helium ignition (or the end of the giant branch, if helium never ignites)
+#     He ignition:  helium burning first supplies HE_IGNITION_LHE_FRACTION of the luminosity
+#     He MS:        minimum of log_center_T after ignition (after the flash, if there is one), while center_he4 is within ZACHEB_DELTA_HE4 of its value at ignition
+#     AGB:          center_he4 drops below TACHEB_CENTER_HE4
+#     WD:           log_R stays below WD_MAX_LOG_R for the rest of the run
+# Each boundary is only searched for after the previous one, so they always come out in order.
+HENYEY_MIN_DLOG_TEFF = 0.05
+ZAMS_LH_FRACTION = 0.99
+TAMS_CENTER_H1 = 1e-4
+HE_IGNITION_LHE_FRACTION = 0.01
+HE_FLASH_LHE_FRACTION = 10 # Helium burning peaking above this fraction of the luminosity right after ignition counts as a flash
+ZACHEB_DELTA_HE4 = 0.03
+TACHEB_CENTER_HE4 = 1e-4
+WD_MAX_LOG_R = -1.0
+
+# History columns detect_boundaries reads. Uploaded or compacted runs don't always have them all; those get no stage highlighting
+DETECTION_COLUMNS = ["model_number", "star_age", "log_L", "log_Teff", "log_LH", "log_LHe", "center_h1", "center_he4", "log_center_T", "log_R"]
+
+
+
+
+
+# Model numbers where each stage starts (None if the run never gets there), plus the last model of the run
+@dataclass
+class StageBoundaries:
+    hayashi: int
+    henyey: int
+    zams: int
+    tams: int
+    rg: int
+    rgb_tip: int
+    he_ignition: int
+    he_ms: int
+    agb: int
+    wd: int
+    last_model: int
+
+
+
+
+
+# First index >= start where mask is True, or None
+def _first(mask, start):
+    if start is None:
+        return None
+    indices = np.flatnonzero(mask[start:])
+    return start + int(indices[0]) if len(indices) > 0 else None
+
+
+
+# Index of the maximum of values[start:end+1], or None
+def _argmax(values, start, end):
+    if start is None or end is None or end < start:
+        return None
+    return start + int(np.argmax(values[start:end+1]))
+
+
+
+# Index of the point of the HR track (x=log_Teff, y=log_L) between start and end that is furthest from the straight line joining them
+def _knee(x, y, start, end):
+    if start is None or end is None or end - start < 2:
+        return None
+    dx, dy = x[end] - x[start], y[end] - y[start]
+    distance = np.abs(dy*(x[start:end+1] - x[start]) - dx*(y[start:end+1] - y[start]))
+    return start + int(np.argmax(distance))
+
+
+
+
+
+# Stage boundaries of a history, as model numbers. Works on any history with the standard MESA-Web columns
+def detect_boundaries(history):
+    log_L = np.asarray(history.log_L)
+    log_Teff = np.asarray(history.log_Teff)
+    log_LH = np.asarray(history.log_LH)
+    log_LHe = np.asarray(history.log_LHe)
+    center_h1 = np.asarray(history.center_h1)
+    center_he4 = np.asarray(history.center_he4)
+    log_center_T = np.asarray(history.log_center_T)
+    log_R = np.asarray(history.log_R)
+    num_models = len(log_L)
+
+    zams = _first(log_LH - log_L >= np.log10(ZAMS_LH_FRACTION), 0)
+
+    henyey = None
+    if zams is not None and zams > 0:
+        henyey = int(np.argmin(log_L[:zams]))
+        if log_Teff[zams] - log_Teff[henyey] < HENYEY_MIN_DLOG_TEFF:
+            henyey = None
+
+    tams = _first(center_h1 < TAMS_CENTER_H1, zams)
+    he_ignition = _first(log_LHe - log_L >= np.log10(HE_IGNITION_LHE_FRACTION), tams)
+
+    # WD: from the last model with log_R above WD_MAX_LOG_R onwards
+    later_max_log_R = np.maximum.accumulate(log_R[::-1])[::-1]
+    wd = _first(later_max_log_R < WD_MAX_LOG_R, he_ignition if he_ignition is not None else tams)
+
+    # Without helium ignition the giant branch ends when the star starts turning into a (helium) white dwarf
+    giant_branch_end = he_ignition if he_ignition is not None else (wd if wd is not None else num_models - 1)
+    rgb_tip = _argmax(log_L, tams, giant_branch_end)
+    rg = _knee(log_Teff, log_L, tams, rgb_tip)
+
+    he_ms = None
+    if he_ignition is not None:
+        window_end = _first(center_he4 < center_he4[he_ignition] - ZACHEB_DELTA_HE4, he_ignition)
+        window_end = num_models - 1 if window_end is None else window_end
+        window_start = _argmax(log_LHe, he_ignition, window_end)
+        if log_LHe[window_start] - log_L[window_start] < np.log10(HE_FLASH_LHE_FRACTION):
+            window_start = he_ignition # Stable ignition: no flash to wait for
+        he_ms = window_start + int(np.argmin(log_center_T[window_start:window_end+1]))
+        if window_end == num_models - 1 and center_he4[-1] >= center_he4[he_ignition] - ZACHEB_DELTA_HE4:
+            he_ms = None # Run ends before core helium burning settles down
+    agb = _first(center_he4 < TACHEB_CENTER_HE4, he_ms)
+    if agb is not None and wd is not None and wd < agb:
+        wd = None
+
+    model_numbers = np.asarray(history.model_number)
+    to_modelnum = lambda index: None if index is None else int(model_numbers[index])
+    return StageBoundaries(
+        hayashi=to_modelnum(0),
+        henyey=to_modelnum(henyey),
+        zams=to_modelnum(zams),
+        tams=to_modelnum(tams),
+        rg=to_modelnum(rg),
+        rgb_tip=to_modelnum(rgb_tip),
+        he_ignition=to_modelnum(he_ignition),
+        he_ms=to_modelnum(he_ms),
+        agb=to_modelnum(agb),
+        wd=to_modelnum(wd),
+        last_model=to_modelnum(num_models - 1))
+
+
+
+
+
+# The substage of parent_stage that a star of this mass goes through (see the mass ranges in catalogue.json), or None if there isn't one
+def substage_for(parent_stage, mass):
+    candidates = [
+        substage for substage in catalogue.get_catalogue().substages_for_parent_stage(parent_stage)
+        if substage.mass_min <= mass <= substage.mass_max ]
+    if len(candidates) == 0:
+        return None
+    # A mass right on the border of two ranges belongs to the higher one, e.g. 1.5 Msun has a Hertzsprung gap, not a subgiant branch
+    return max(candidates, key=lambda substage: substage.mass_min)
+
+
+
+# Profile to show for a stage: the saved profile closest to the middle of the stage in log(age)
+def _example_modelnum(history, model_numbers_available, modelnum_start, modelnum_end):
+    model_numbers_available = np.asarray(model_numbers_available)
+    in_stage = model_numbers_available[(model_numbers_available >= modelnum_start) & (model_numbers_available <= modelnum_end)]
+    if len(in_stage) == 0:
+        return None
+    log_age = np.log10(np.maximum(history.star_age, 1e-10))
+    log_age_middle = (log_age[modelnum_start-1] + log_age[modelnum_end-1]) / 2
+    return int(in_stage[np.argmin(np.abs(log_age[in_stage-1] - log_age_middle))])
+
+
+
+
+
+# MESA_model records for a run, built from its detected stage boundaries, in the same form as the hand-tuned ones in catalogue.json:
+# a SUB_NONE record, then one record per stage the run reaches, each ending where the next one starts.
+# A stage that doesn't exist at this mass (e.g. post-MS for 0.2 Msun) is left out, and the stage before it runs on to the next one
+def models_from_boundaries(boundaries, mass, MESA_folder_path, history, model_numbers_available):
+    stage_starts = [
+        (parent_stages.PARENT_HAYASHI, boundaries.hayashi),
+        (parent_stages.PARENT_HENYEY, boundaries.henyey),
+        (parent_stages.PARENT_MS, boundaries.zams),
+        (parent_stages.PARENT_POSTMS, boundaries.tams),
+        (parent_stages.PARENT_RG, boundaries.rg),
+        (parent_stages.PARENT_HEIGN, boundaries.he_ignition),
+        (parent_stages.PARENT_HEMS, boundaries.he_ms),
+        (parent_stages.PARENT_AGB, boundaries.agb),
+        (parent_stages.PARENT_WD, boundaries.wd),
+    ]
+    stage_starts = [
+        (substage_for(parent_stage, mass), modelnum_start) for parent_stage, modelnum_start in stage_starts
+        if modelnum_start is not None and substage_for(parent_stage, mass) is not None ]
+
+    models = [MESA_models.MESA_model(
+        mass=mass,
+        substage=sub_stages.SUB_NONE,
+        model_start=None,
+        model_example=None,
+        model_end=None,
+        MESA_folder_path=MESA_folder_path)]
+    for i, (substage, modelnum_start) in enumerate(stage_starts):
+        modelnum_end = stage_starts[i+1][1] if i+1 < len(stage_starts) else boundaries.last_model
+        if modelnum_end <= modelnum_start:
+            continue
+        models.append(MESA_models.MESA_model(
+            mass=mass,
+            substage=substage,
+            model_start=modelnum_start,
+            model_example=_example_modelnum(history, model_numbers_available, modelnum_start, modelnum_end),
+            model_end=modelnum_end,
+            MESA_folder_path=MESA_folder_path))
+    return misc.CustomList(models)
+
+
+
+
+
+# Columns of DETECTION_COLUMNS that a history doesn't have
+def missing_columns(history):
+    return [name for name in DETECTION_COLUMNS if name not in history.bulk_names]
+
+
+
+# Detected MESA_model records for a run folder (none, if its history is missing any of DETECTION_COLUMNS).
+# Cached per run, and rebuilt once when refresh_run() picks up new models
+def detect_models(MESA_folder_path):
+    folder = mesa_folder.get_folder(MESA_folder_path)
+    return _detect_models(folder.path, folder.revision)
+
+@lru_cache(maxsize=32)
+def _detect_models(MESA_folder_path, revision):
+    history = load_data.load_history(MESA_folder_path)
+    if missing_columns(history):
+        return misc.CustomList([])
+    return models_from_boundaries(
+        detect_boundaries(history),
+        history.initial_mass_string,
+        MESA_folder_path,
+        history,
+        history.model_numbers_available)
@@ -1,8 +1,17 @@
 import mesa_reader as mr 
 import numpy as np 
+import math 
+import asyncio 
+import functools 
+from concurrent.futures import ThreadPoolExecutor 
 from functools import lru_cache 
 import matplotlib.ticker as mticker 
 from . import misc
+from .mesa_io import mesa_folder 
+from .mesa_io import profile_cache 
+from .mesa_io import annotated_profile 
+from .mesa_io import prefetch 
+from .mesa_io import virtual_profile 
 
 
 
@@ -11,96 +20,27 @@ from . import misc
 # lru_cache allows you to cache function calls. maxsize is the number of distinct calls it can hold in memory at once. 
 # If you run load_history() on the same input a 2nd time, it doesn't actually run the function again; 
 # it just loads the pre-saved data. This makes load_history much faster. 
-@lru_cache(maxsize=32) 
+# The folder's revision is part of the cache key, so after refresh_run() picks up new data the history is rebuilt once. 
 def load_history(MESA_folder_path): 
+    folder = mesa_folder.get_folder(MESA_folder_path) 
+    return _load_history(folder.path, folder.revision) 
 
-    try: 
-        history = mr.MesaData(str(MESA_folder_path/"history.data"))  
-        folder_mesa = mr.MesaLogDir(MESA_folder_path, history_file="history.data") 
+@lru_cache(maxsize=32) 
+def _load_history(MESA_folder_path, revision): 
 
-    except FileNotFoundError: 
-        history = mr.MesaData(str(MESA_folder_path/"trimmed_history.data"))  
-        folder_mesa = mr.MesaLogDir(MESA_folder_path, history_file="trimmed_history.data") 
+    # The folder handle (see mesa_io/mesa_folder.py) owns the history and profiles.index, so neither is read more than once 
+    folder = mesa_folder.get_folder(MESA_folder_path) 
+    history = folder.history 
 
     # Add list of available model numbers to History object 
-    history.model_numbers_available = folder_mesa.model_numbers 
+    history.model_numbers_available = folder.model_numbers 
 
     # Add initial mass string (used for plot titles)
     history.initial_mass_string = round(history.star_mass[0], 10)
 
     # Add list of age strings (used for titles) 
     # Calculates just enough decimal places for each string to be distinct from its neighbors and puts it in engineering notation 
-    history.age_strings = [str(age) for age in history.star_age] # Initialize array 
-    for ind in range(len(history.model_numbers_available)):
-
-        # current model 
-        modelnum_current = history.model_numbers_available[ind]
-        age_current = history.star_age[modelnum_current-1]
-
-        # previous model
-        if ind == 0:
-            modelnum_previous = np.nan
-            age_previous = 0.0
-        else:
-            modelnum_previous = history.model_numbers_available[ind - 1]
-            age_previous = history.star_age[modelnum_previous-1]
-
-        # next model
-        if ind == len(history.model_numbers_available) - 1:
-            modelnum_next = np.nan
-            age_next = age_current*2
-        else:
-            modelnum_next = history.model_numbers_available[ind + 1]
-            age_next = history.star_age[modelnum_next-1]
-
-
-        num_sigfigs = np.max([len(str(age).replace(".", "")) for age in [age_previous, age_current, age_next]]) 
-        
-
-        # Initialize 
-        rounded_previous = misc.round_sigfigs(age_previous, num_sigfigs) 
-        rounded_current = misc.round_sigfigs(age_current, num_sigfigs) 
-        rounded_next = misc.round_sigfigs(age_next, num_sigfigs) 
-
-        # Keep looping until rounding has gone too far, then take the previous iteration 
-        while str(rounded_current) != str(rounded_previous) and str(rounded_current) != str(rounded_next): 
-
-            age_previous = rounded_previous 
-            age_current = rounded_current 
-            age_next = rounded_next 
-
-            rounded_previous = misc.round_sigfigs(age_previous, num_sigfigs) 
-            rounded_current = misc.round_sigfigs(age_current, num_sigfigs) 
-            rounded_next = misc.round_sigfigs(age_next, num_sigfigs) 
-
-            num_sigfigs-=1 
-
-            # Minimum of 4 sig figs 
-            if num_sigfigs <= 2: 
-                break         
-
-
-        power = np.floor(np.log10(age_current)) 
-        if power == 12 or power == 13 or power == 14: 
-            n = 12 
-            suffix = " T years"
-        elif power == 9 or power == 10 or power == 11: 
-            n = 9 
-            suffix = " G years" 
-        elif power == 6 or power == 7 or power == 8: 
-            n = 6 
-            suffix = " M years" 
-        elif power == 3 or power == 4 or power == 5: 
-            n = 3 
-            suffix = " k years"
-        else: 
-            n = 0 
-            suffix = " years" 
-        
-        
-        mantissa = misc.round_sigfigs(age_current / 10**n, num_sigfigs+2) 
-        age_string_final = str(mantissa) + suffix
-        history.age_strings[modelnum_current-1] = age_string_final 
+    history.age_strings = calc_age_strings(history.star_age, history.model_numbers_available) 
 
     return history 
 
@@ -108,27 +48,254 @@ def load_history(MESA_folder_path):
 
 
 
-@lru_cache(maxsize=128)
+# Floor of log10(|x|) for each (nonzero) element. 
+# misc.round_sigfigs uses math.log10, which can disagree with np.log10 in the last bit right next to a power of 10, 
+# so those few elements are recomputed with math.log10 to keep the results identical 
+def _floor_log10(x): 
+    log_x = np.log10(np.abs(x)) 
+    exponent = np.floor(log_x) 
+    for i in np.flatnonzero(np.abs(log_x - np.round(log_x)) < 1e-9): 
+        exponent[i] = math.floor(math.log10(abs(x[i]))) 
+    return exponent.astype(int) 
+
+
+
+
+
+# Vectorised misc.round_sigfigs: returns the same values as calling it on each element, with a different num_sigfigs per element. 
+# misc.round_sigfigs turns whole numbers into Python ints, and rounding an int later on is exact instead of going through numpy's 
+# round, so "is_int" tracks which elements are ints. Returns the rounded values and their is_int flags. 
+def _round_sigfigs_array(x, num_sigfigs, is_int): 
+    rounded = np.zeros(len(x)) 
+    nonzero = x != 0 
+    decimals = np.zeros(len(x), dtype=int) 
+    decimals[nonzero] = num_sigfigs[nonzero] - _floor_log10(x[nonzero]) - 1 
+
+    # round(int, decimals) leaves the int unchanged when decimals >= 0 
+    unchanged = nonzero & is_int & (decimals >= 0) 
+    rounded[unchanged] = x[unchanged] 
+
+    # Everything else goes through np.round, one call per distinct number of decimals 
+    to_round = nonzero & ~unchanged 
+    for d in np.unique(decimals[to_round]): 
+        group = to_round & (decimals == d) 
+        rounded[group] = np.round(x[group], d) 
+
+    rounded_is_int = nonzero & (rounded == np.floor(rounded)) 
+    return rounded, rounded_is_int 
+
+
+
+
+
+# Same as _round_sigfigs_array, but for Python floats, which Python's round() rounds exactly in decimal (not like np.round). 
+# "%.<d>f" formatting does the same exact rounding as round(x, d) 
+def _round_sigfigs_array_exact(x, num_sigfigs): 
+    rounded = np.zeros(len(x)) 
+    nonzero = x != 0 
+    decimals = np.zeros(len(x), dtype=int) 
+    decimals[nonzero] = num_sigfigs[nonzero] - _floor_log10(x[nonzero]) - 1 
+
+    for d in np.unique(decimals[nonzero]): 
+        group = nonzero & (decimals == d) 
+        if d >= 0: 
+            rounded[group] = np.char.mod(f"%.{d}f", x[group]).astype(float) 
+        else: 
+            rounded[group] = [round(float(value), int(d)) for value in x[group]] 
+
+    rounded_is_int = nonzero & (rounded == np.floor(rounded)) 
+    return rounded, rounded_is_int 
+
+
+
+
+
+# Create the list of age strings for every model (used in plot titles and the profile dropdown). 
+# Models with a saved profile get a string in engineering notation with just enough significant figures to be distinct 
+# from the neighboring saved models (e.g. "462.1 G years"); every other model just gets str(age). 
+# Computed for all saved models at once: each pass of the loop below drops one significant figure from every model that 
+# is still distinct from its neighbors, and a model stops as soon as rounding it any further would make it match one. 
+def calc_age_strings(star_age, model_numbers_available): 
+    age_strings = star_age.astype(str).astype(object) 
+    if len(model_numbers_available) == 0: 
+        return age_strings.tolist() 
+
+    # Age of each saved model and its neighbors (the first model is compared to 0, the last one to twice its age) 
+    ind = np.asarray(model_numbers_available) - 1 
+    age_current = star_age[ind].astype(float) 
+    age_previous = np.concatenate([[0.0], age_current[:-1]]) 
+    age_next = np.concatenate([age_current[1:], [age_current[-1]*2]]) 
+
+    # Start from the number of digits needed to write out the longest of the 3 ages 
+    num_sigfigs = np.maximum.reduce([
+        np.char.str_len(np.char.replace(ages.astype(str), ".", "")) 
+        for ages in [age_previous, age_current, age_next]]) 
+
+    # Initialize 
+    ages = [age_previous, age_current, age_next] 
+    ages_is_int = [np.zeros(len(ind), dtype=bool) for _ in ages] 
+    rounded, rounded_is_int = zip(*[_round_sigfigs_array(a, num_sigfigs, a_is_int) for a, a_is_int in zip(ages, ages_is_int)]) 
+
+    # Keep looping until rounding has gone too far, then take the previous iteration 
+    active = np.ones(len(ind), dtype=bool) 
+    while True: 
+        active &= (rounded[1] != rounded[0]) & (rounded[1] != rounded[2]) 
+        if not np.any(active): 
+            break 
+
+        ages = [np.where(active, r, a) for r, a in zip(rounded, ages)] 
+        ages_is_int = [np.where(active, r_is_int, a_is_int) for r_is_int, a_is_int in zip(rounded_is_int, ages_is_int)] 
+        new_rounded = [_round_sigfigs_array(a[active], num_sigfigs[active], a_is_int[active]) for a, a_is_int in zip(ages, ages_is_int)] 
+        rounded = [r.copy() for r in rounded] 
+        rounded_is_int = [r_is_int.copy() for r_is_int in rounded_is_int] 
+        for k in range(3): 
+            rounded[k][active], rounded_is_int[k][active] = new_rounded[k] 
+
+        num_sigfigs = np.where(active, num_sigfigs-1, num_sigfigs) 
+
+        # Minimum of 4 sig figs 
+        active &= num_sigfigs > 2 
+
+    age_current = ages[1] 
+    age_current_is_int = ages_is_int[1] 
+
+    # Engineering notation: k, M, G, T years 
+    power = np.full(len(ind), -1) 
+    positive = age_current > 0 
+    power[positive] = np.floor(np.log10(age_current[positive])) 
+    n = np.where((power >= 3) & (power <= 14), (power // 3) * 3, 0) 
+    suffixes = {12: " T years", 9: " G years", 6: " M years", 3: " k years", 0: " years"} 
+
+    # Ages that are ints get divided into a Python float (exact rounding); the rest stay numpy floats (np.round) 
+    mantissa_unrounded = age_current / 10.0**n 
+    mantissa, mantissa_is_int = _round_sigfigs_array(mantissa_unrounded, num_sigfigs+2, np.zeros(len(ind), dtype=bool)) 
+    mantissa_exact, mantissa_exact_is_int = _round_sigfigs_array_exact(mantissa_unrounded[age_current_is_int], num_sigfigs[age_current_is_int]+2) 
+    mantissa[age_current_is_int] = mantissa_exact 
+    mantissa_is_int[age_current_is_int] = mantissa_exact_is_int 
+
+    mantissa_strings = np.where(mantissa_is_int, mantissa.astype(np.int64).astype(str), mantissa.astype(str)) 
+    age_strings[ind] = [m + suffixes[power_n] for m, power_n in zip(mantissa_strings.tolist(), n.tolist())] 
+    return age_strings.tolist() 
+
+
+
+
+
+# Loaded profiles are kept in a cache bounded mainly by memory (see mesa_io/profile_cache.py), since one profile can hold 
+# anywhere from a few kB to several MB. PROFILE_CACHE.max_bytes sets the budget, and PROFILE_CACHE.max_entries caps the number 
+# of profiles (and so of open memory maps); PROFILE_CACHE.stats reports hits, misses (one per profile parsed) and evictions. 
+PROFILE_CACHE = profile_cache.ProfileCache() 
+
+# The cached profile only depends on (folder, model number). The info that depends on the history (age, initial mass, ...) 
+# goes on a cheap wrapper around it (see mesa_io/annotated_profile.py), so loading the same profile with or without a history, 
+# or with a reloaded history, still only parses it once. 
 def load_profile(MESA_folder_path, modelnum, history=None): 
 
-    try: 
-        folder_mesa = mr.MesaLogDir(str(MESA_folder_path), history_file="history.data") 
-
-    except mr.BadPathError: 
-        folder_mesa = mr.MesaLogDir(str(MESA_folder_path), history_file="trimmed_history.data") 
-
-    # Load profile; add some additional important info to profile variable 
-    profile = folder_mesa.profile_data(modelnum) 
-    profile.modelnum = modelnum 
-    profile.index = modelnum-1 
-    if history is not None: 
-        profile.age = history.star_age[profile.index] 
-        profile.age_string = history.age_strings[profile.index] 
-        profile.initial_mass = history.star_mass[0] 
-        profile.initial_mass_string = history.initial_mass_string 
+    # Load profile (through the shared folder handle); add some additional important info to profile variable 
+    folder = mesa_folder.get_folder(MESA_folder_path) 
+    profile = PROFILE_CACHE.get(folder.path, modelnum, lambda: folder.loaded_profile_data(modelnum)) 
+    return annotated_profile.AnnotatedProfile(profile, modelnum, history) 
+
+
+
+
+
+
+# Profile at any model number, not just the ones MESA saved: between two saved profiles it is interpolated in time from them 
+# (see mesa_io/virtual_profile.py). At a saved model number this is the same as load_profile(). 
+# The bracketing pair (with every column regridded so far) is cached, so moving between the same two saved profiles 
+# only blends columns. Raises ValueError for model numbers before the first or after the last saved profile. 
+def load_virtual_profile(MESA_folder_path, modelnum, history): 
+    model_numbers = np.asarray(history.model_numbers_available) 
+    if modelnum in model_numbers: 
+        return load_profile(MESA_folder_path, modelnum, history) 
+    if len(model_numbers) == 0 or not model_numbers[0] < modelnum < model_numbers[-1]: 
+        raise ValueError(f"Model {modelnum} is outside the range of saved profiles, so there is nothing to interpolate between") 
+
+    i = np.searchsorted(model_numbers, modelnum) 
+    lower, upper = int(model_numbers[i-1]), int(model_numbers[i]) 
+    pair = _profile_pair(mesa_folder.get_folder(MESA_folder_path).path, lower, upper) 
+
+    # Weight by age, which is what the interpolation is in 
+    age_lower, age_upper, age = history.star_age[lower-1], history.star_age[upper-1], history.star_age[modelnum-1] 
+    t = (age - age_lower) / (age_upper - age_lower) if age_upper != age_lower else (modelnum - lower) / (upper - lower) 
+
+    profile = virtual_profile.VirtualProfile(pair, t, modelnum, age, history.star_mass[modelnum-1]) 
+    return annotated_profile.AnnotatedProfile(profile, modelnum, history) 
+
+@lru_cache(maxsize=4) 
+def _profile_pair(MESA_folder_path, lower, upper): 
+    return virtual_profile.ProfilePair(load_profile(MESA_folder_path, lower).profile, load_profile(MESA_folder_path, upper).profile) 
+
+
+
+
+
+
+# Background loading of the profiles next to the selected one (see mesa_io/prefetch.py), for stepping through a run one model at a time. 
+# PROFILE_PREFETCHER.depth sets how many profiles on each side are loaded ahead of time. 
+PROFILE_PREFETCHER = prefetch.Prefetcher(PROFILE_CACHE) 
+
+def prefetch_neighboring_profiles(MESA_folder_path, modelnum, history): 
+    PROFILE_PREFETCHER.prefetch(MESA_folder_path, modelnum, history.model_numbers_available) 
+
+
+
+
+
+
+# Async versions of the loaders, for marimo cells that `await` them instead of blocking the reactive graph on file I/O. 
+# The load runs on LOAD_EXECUTOR, including reading the binary cache (or parsing the ASCII file), which otherwise happens 
+# on first column access. They share the caches of the synchronous loaders. 
+# The browser (Pyodide) build has no threads, so there they load inline and return an already finished result. 
+LOAD_WORKERS = 4 if prefetch.THREADS_AVAILABLE else 0 
+_load_executor = None 
+
+async def _run_in_executor(func, *args): 
+    global _load_executor 
+    if LOAD_WORKERS <= 0: 
+        return func(*args) 
+    if _load_executor is None: 
+        _load_executor = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="mesa-load") 
+    return await asyncio.get_running_loop().run_in_executor(_load_executor, functools.partial(func, *args)) 
+
+def _load_history_now(MESA_folder_path): 
+    history = load_history(MESA_folder_path) 
+    history.load() 
+    return history 
+
+def _load_profile_now(MESA_folder_path, modelnum, history): 
+    profile = load_profile(MESA_folder_path, modelnum, history) 
+    profile.load() 
     return profile 
 
+async def load_history_async(MESA_folder_path): 
+    return await _run_in_executor(_load_history_now, MESA_folder_path) 
+
+async def load_profile_async(MESA_folder_path, modelnum, history=None): 
+    return await _run_in_executor(_load_profile_now, MESA_folder_path, modelnum, history) 
+
+# Load the histories of several runs concurrently (e.g. every mass on the stage-first HR diagram). 
+# Returns {folder path: history}; each distinct folder is only loaded once 
+async def load_histories_async(MESA_folder_paths): 
+    MESA_folder_paths = list(dict.fromkeys(MESA_folder_paths)) 
+    histories = await asyncio.gather(*[load_history_async(MESA_folder_path) for MESA_folder_path in MESA_folder_paths]) 
+    return dict(zip(MESA_folder_paths, histories)) 
+
+
 
 
 
 
+# For a MESA run that is still being computed: read whatever has been added to history.data and profiles.index since 
+# the last call (only the new rows are parsed, see mesa_io/live_run.py). Returns True if there was anything new, 
+# in which case the next load_history() call returns an updated history. 
+# If the run was restarted (history replaced or cut short, or profiles.index rewritten), the profiles cached from before 
+# the restart are dropped too, since the profile files with those model numbers have been rewritten. 
+def refresh_run(MESA_folder_path): 
+    folder = mesa_folder.get_folder(MESA_folder_path) 
+    changed = folder.refresh() 
+    if folder.restarted: 
+        PROFILE_CACHE.evict_folder(folder.path) 
+        _profile_pair.cache_clear() # Can't drop one folder's pairs from an lru_cache, but it only holds a few 
+    return changed 
@@ -0,0 +1,13 @@
+from . import shared_store 
+from . import binary_cache 
+from . import lazy_data 
+from . import mesa_folder 
+from . import profile_cache 
+from . import annotated_profile 
+from . import prefetch 
+from . import ingest 
+from . import run_pack 
+from . import live_run 
+from . import catalogue_scan 
+from . import run_metadata 
+from . import virtual_profile 
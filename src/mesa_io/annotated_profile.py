@@ -0,0 +1,34 @@
+# Lightweight wrapper that adds the per-call info (model number, age, initial mass, ...) on top of a cached profile.
+# The parsed profile only depends on (folder, model number), so it is cached on that alone (see profile_cache.py);
+# anything that depends on the history it was loaded with lives on this wrapper instead of on the shared profile.
+# Every other attribute (columns, data(), header_data, ...) is read straight from the wrapped profile.
+class AnnotatedProfile:
+
+    def __init__(self, profile, modelnum, history=None):
+        self.profile = profile
+        self.modelnum = modelnum
+        self.index = modelnum-1
+        if history is not None:
+            self.age = history.star_age[self.index]
+            self.age_string = history.age_strings[self.index]
+            self.initial_mass = history.star_mass[0]
+            self.initial_mass_string = history.initial_mass_string
+
+
+
+    def __getattr__(self, name):
+        # Only called for attributes not set above. Look in __dict__ directly so a half-built object
+        # (e.g. during unpickling) raises AttributeError instead of recursing
+        profile = self.__dict__.get("profile")
+        if profile is None:
+            raise AttributeError(name)
+        return getattr(profile, name)
+
+
+
+    # Special methods skip __getattr__, so pass on the ones mr.MesaData defines
+    def __str__(self):
+        return str(self.profile)
+
+    def __lt__(self, other):
+        return self.profile < getattr(other, "profile", other)
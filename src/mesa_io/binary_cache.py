@@ -0,0 +1,319 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import mesa_reader as mr
+
+from . import shared_store
+
+
+
+
+
+# Sidecar files live in a hidden subfolder of the MESA folder they were made from
+CACHE_FOLDER_NAME = ".mesa_cache"
+
+# Bump this whenever the on-disk layout changes, so that caches written by older code are ignored and rebuilt
+CACHE_FORMAT_VERSION = 3
+
+# Header entry compact_history.py writes in histories it has thinned out (value: the rtol it used). Only these are densified
+# (see densify_model_numbers); raw MESA output with history_interval > 1 also skips model numbers, but has no rows to fill in
+THINNED_HEADER_NAME = "thinned_rtol"
+
+# Files whose sidecar can't be written (e.g. a read-only data folder) are cached here instead, shared by every process of
+# the same user on the machine; parsing them also goes through its per-file lock, so sessions don't each parse the same file
+# (see shared_store.py)
+SHARED_STORE = shared_store.SharedStore()
+
+
+
+
+
+# Holds the parsed contents of one MESA log file (history or profile) in column-major form.
+# columns[i] holds every row of bulk_names[i], so one column can be read out of a memory-mapped
+# file without touching the rest of it. All columns are stored as float64; dtypes records the
+# original dtype of each column (e.g. int64 for model_number) so it can be restored on the way out.
+class ColumnStore:
+
+    def __init__(self, bulk_names, dtypes, columns, header_names, header_data):
+        self.bulk_names = tuple(bulk_names)
+        self.dtypes = [np.dtype(dtype) for dtype in dtypes]
+        self.columns = columns
+        self.header_names = list(header_names)
+        self.header_data = dict(header_data)
+        self._column_index = {name: i for i, name in enumerate(self.bulk_names)}
+
+
+
+    @property
+    def num_rows(self):
+        return self.columns.shape[1]
+
+
+
+    # Return one column with its original dtype.
+    # Float columns are returned as views, so a column of a memory-mapped store is only read from disk when used
+    def column(self, name):
+        i = self._column_index[name]
+        values = np.asarray(self.columns[i])
+        if values.dtype != self.dtypes[i]:
+            values = values.astype(self.dtypes[i])
+        return values
+
+
+
+    # Rebuild the structured array that mesa_reader stores in MesaData.bulk_data
+    def to_structured_array(self):
+        bulk_data = np.empty(self.num_rows, dtype=list(zip(self.bulk_names, self.dtypes)))
+        for name in self.bulk_names:
+            bulk_data[name] = self.column(name)
+        return bulk_data
+
+
+
+    # Create a regular mr.MesaData object without re-parsing the ASCII file
+    def to_mesa_data(self, file_name):
+        mesa_data = mr.MesaData.__new__(mr.MesaData)
+        mesa_data.file_name = str(file_name)
+        mesa_data.file_type = "log"
+        mesa_data.bulk_data = self.to_structured_array()
+        mesa_data.bulk_names = self.bulk_names
+        mesa_data.header_names = list(self.header_names)
+        mesa_data.header_data = dict(self.header_data)
+        return mesa_data
+
+
+
+    # Returns None if the file has non-numeric columns, which can't be held in a single float64 block
+    @classmethod
+    def from_mesa_data(cls, mesa_data):
+        bulk_data = mesa_data.bulk_data
+        dtypes = [bulk_data.dtype[name] for name in mesa_data.bulk_names]
+        if any(dtype.kind not in "biuf" for dtype in dtypes):
+            return None
+
+        columns = np.empty((len(mesa_data.bulk_names), len(bulk_data)), dtype=np.float64)
+        for i, name in enumerate(mesa_data.bulk_names):
+            columns[i] = bulk_data[name]
+
+        return cls(
+            bulk_names=mesa_data.bulk_names,
+            dtypes=dtypes,
+            columns=columns,
+            header_names=mesa_data.header_names,
+            header_data=mesa_data.header_data)
+
+
+
+
+
+# Thinned histories (see compact_history.py) skip model numbers, but the app finds a model's row as model_number-1.
+# Fill the gaps back in by linear interpolation in model number, so that every model has a row again.
+# Returns the store unchanged unless it was thinned by compact_history.py (THINNED_HEADER_NAME in its header),
+# or if it has no model_number column or no gaps (or if model numbers aren't increasing)
+def densify_model_numbers(store):
+    if THINNED_HEADER_NAME not in store.header_data or "model_number" not in store.bulk_names:
+        return store
+    model_numbers = store.column("model_number")
+    if len(model_numbers) < 2 or np.any(np.diff(model_numbers) <= 0) or model_numbers[-1] - model_numbers[0] + 1 == len(model_numbers):
+        return store
+
+    dense_model_numbers = np.arange(model_numbers[0], model_numbers[-1]+1)
+    columns = np.empty((len(store.bulk_names), len(dense_model_numbers)), dtype=np.float64)
+    for i, dtype in enumerate(store.dtypes):
+        columns[i] = np.interp(dense_model_numbers, model_numbers, store.columns[i])
+        if dtype.kind in "biu":
+            columns[i] = np.round(columns[i])
+
+    return ColumnStore(
+        bulk_names=store.bulk_names,
+        dtypes=store.dtypes,
+        columns=columns,
+        header_names=store.header_names,
+        header_data=store.header_data)
+
+
+
+
+
+# Location of the two sidecar files for a MESA file:
+# "<name>.npy" holds the (num_columns, num_rows) float64 block, "<name>.json" holds everything else
+def cache_paths(source_path):
+    source_path = Path(source_path)
+    cache_folder = source_path.parent / CACHE_FOLDER_NAME
+    return cache_folder / f"{source_path.name}.npy", cache_folder / f"{source_path.name}.json"
+
+
+
+
+
+# The cache is only valid if the source file still has the same modification time and size as when the cache was written
+def source_signature(source_path):
+    stat = os.stat(source_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+
+
+
+# Read a ColumnStore from a .npy/.json pair, or return None if it isn't there or is out of date (signature doesn't match)
+def _read_store_files(npy_path, json_path, signature, mmap=True):
+    try:
+        with open(json_path, "r") as f:
+            meta = json.load(f)
+        if meta["version"] != CACHE_FORMAT_VERSION or meta["source"] != signature:
+            return None
+
+        columns = None
+        if mmap:
+            try:
+                columns = np.load(npy_path, mmap_mode="r")
+            except (OSError, ValueError):
+                columns = None # Some filesystems can't be memory-mapped; fall back to a normal read below
+        if columns is None:
+            columns = np.load(npy_path)
+
+        if columns.shape != (len(meta["bulk_names"]), meta["num_rows"]):
+            return None
+
+        return ColumnStore(
+            bulk_names=meta["bulk_names"],
+            dtypes=meta["dtypes"],
+            columns=columns,
+            header_names=meta["header_names"],
+            header_data=meta["header_data"])
+
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+
+# Write a ColumnStore as a .npy/.json pair. Returns True if it was written
+def _write_store_files(npy_path, json_path, store, signature):
+    meta = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": signature,
+        "num_rows": store.num_rows,
+        "bulk_names": list(store.bulk_names),
+        "dtypes": [dtype.str for dtype in store.dtypes],
+        "header_names": store.header_names,
+        "header_data": store.header_data,
+    }
+
+    # Write to temporary files and rename them into place, so a half-written cache is never picked up.
+    # The .json file is written last: it holds the source signature, so it is what marks the cache as valid.
+    # Temporary names are unique per process and thread, since a background prefetch can write the same cache as the main thread
+    tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    npy_tmp_path = npy_path.with_name(npy_path.name + tmp_suffix)
+    json_tmp_path = json_path.with_name(json_path.name + tmp_suffix)
+    try:
+        npy_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(npy_tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(store.columns, dtype=np.float64))
+        os.replace(npy_tmp_path, npy_path)
+        with open(json_tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(json_tmp_path, json_path)
+        return True
+
+    except (OSError, TypeError, ValueError):
+        for tmp_path in [npy_tmp_path, json_tmp_path]:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        return False
+
+
+
+
+
+# Load a cached ColumnStore, from its sidecar files or else from the shared store, or return None if there isn't a valid one.
+# Raises FileNotFoundError if the source file itself doesn't exist.
+def read_cached_store(source_path, mmap=True):
+    signature = source_signature(source_path)
+    store = _read_store_files(*cache_paths(source_path), signature, mmap)
+    if store is not None:
+        return store
+
+    if not SHARED_STORE.ready():
+        return None
+    key = SHARED_STORE.key(source_path, signature)
+    store = _read_store_files(*SHARED_STORE.entry_paths(key), signature, mmap)
+    if store is not None and isinstance(store.columns, np.memmap):
+        SHARED_STORE.attach(key, store.columns) # Leased until every column sliced out of it is gone
+    return store
+
+
+
+
+
+# Write the sidecar files for a source file. Returns True if the cache was written.
+# Writing is best-effort: a read-only data folder just means the file goes in the shared store instead (see load_store).
+def write_cached_store(source_path, store, signature=None):
+    if signature is None:
+        signature = source_signature(source_path)
+    return _write_store_files(*cache_paths(source_path), store, signature)
+
+
+
+# Put a parsed file in the shared store, making room for it if needed. Returns True if it was written
+def publish_shared_store(source_path, store, signature=None):
+    if signature is None:
+        signature = source_signature(source_path)
+    if not SHARED_STORE.ready():
+        return False
+    written = _write_store_files(*SHARED_STORE.entry_paths(SHARED_STORE.key(source_path, signature)), store, signature)
+    if written:
+        SHARED_STORE.evict()
+    return written
+
+
+
+
+
+# Load a MESA log file as a ColumnStore: use the binary cache (or the shared store) if it is valid,
+# otherwise parse the ASCII file with mesa_reader and write the cache for next time (or the shared store, if the cache can't be written).
+# Histories thinned by compact_history.py are filled back in on the way (see densify_model_numbers).
+# Returns None if the file can't be held in a ColumnStore (non-numeric columns).
+def load_store(source_path):
+    source_path = Path(source_path)
+
+    store = read_cached_store(source_path)
+    if store is not None:
+        return store
+
+    signature = source_signature(source_path)
+    if _cache_folder_writable(source_path):
+        return _parse_and_write(source_path, signature)
+
+    # Going to the shared store: one process at a time parses a given file; the others wait here and then use what it wrote
+    with SHARED_STORE.locked(SHARED_STORE.key(source_path, signature)):
+        store = read_cached_store(source_path)
+        if store is not None:
+            return store
+        return _parse_and_write(source_path, signature)
+
+
+
+# Parse the ASCII file and write its cache (or else put it in the shared store)
+def _parse_and_write(source_path, signature):
+    store = ColumnStore.from_mesa_data(mr.MesaData(str(source_path)))
+    if store is None:
+        return None
+    store = densify_model_numbers(store)
+
+    # Re-open the freshly written cache so its columns are memory-mapped rather than held in memory
+    if write_cached_store(source_path, store, signature) or publish_shared_store(source_path, store, signature):
+        store = read_cached_store(source_path) or store
+    return store
+
+
+
+# Whether the sidecar files of a source file can (probably) be written: the cache folder, or the folder it would be made in, is writable
+def _cache_folder_writable(source_path):
+    cache_folder = cache_paths(source_path)[0].parent
+    folder = cache_folder if cache_folder.is_dir() else cache_folder.parent
+    return os.access(folder, os.W_OK)
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
+from pathlib import Path
+
+import mesa_reader as mr
+
+from . import ingest
+from . import lazy_data
+from . import mesa_folder
+from . import prefetch
+from . import run_pack
+
+
+
+
+
+# Finds every MESA run under a data directory and checks that each one can actually be loaded, without loading it:
+# only the history header and profiles.index are read (or the table of contents of a run pack).
+# Results are cached per directory, keyed on the directory's mtime, in <root>/.mesa_scan.json. A directory's mtime
+# changes whenever a file or subfolder is added, removed or renamed in it, so on a repeat scan an unchanged directory
+# costs one stat() and is neither listed nor validated again. Directories are visited concurrently, a level at a time.
+SCAN_FILE_NAME = ".mesa_scan.json"
+SCAN_FORMAT_VERSION = 1
+
+# Files whose presence makes a folder a MESA run
+RUN_MARKER_FILE_NAMES = ["profiles.index", run_pack.PACK_FILE_NAME] + mesa_folder.HISTORY_FILE_NAMES
+
+
+
+
+
+@dataclass
+class RunStatus:
+    path: str # Relative to the scanned directory ("." for the directory itself)
+    mtime_ns: int # Directory mtime when it was scanned
+    is_run: bool = False
+    problems: list = field(default_factory=list) # Why the run can't be loaded; empty if it can
+    history_file: str = None
+    num_profiles: int = 0
+    subdirs: list = field(default_factory=list) # Names of subfolders, so an unchanged directory can be walked without listing it
+
+
+    @property
+    def valid(self):
+        return self.is_run and len(self.problems) == 0
+
+
+
+
+
+# Profile numbers listed in a profiles.index (its last column). Much cheaper than mr.MesaProfileIndex, which goes through pandas
+def read_profile_numbers(file_name):
+    with open(file_name, "r") as f:
+        lines = f.readlines()[mr.MesaProfileIndex.index_start_line-1:]
+    return [int(line.split()[-1]) for line in lines if line.strip()]
+
+
+
+# Check a run folder given the names of the files in it. Returns (history file name, number of profiles, problems)
+def validate_run(path, file_names):
+    path = Path(path)
+    if run_pack.PACK_FILE_NAME in file_names:
+        pack = run_pack.open_pack(path)
+        if pack is not None:
+            return _validate_pack(pack)
+
+    problems = []
+    history_file = next((name for name in mesa_folder.HISTORY_FILE_NAMES if name in file_names), None)
+    if history_file is None:
+        problems.append(f"no history file ({' or '.join(mesa_folder.HISTORY_FILE_NAMES)})")
+    else:
+        try:
+            _, _, bulk_names = lazy_data.read_header(path/history_file)
+            missing = [name for name in ingest.REQUIRED_HISTORY_COLUMNS if name not in bulk_names]
+            if missing:
+                problems.append(f"{history_file} is missing columns {missing}")
+        except Exception as e:
+            problems.append(f"{history_file} header can't be read ({e})")
+
+    num_profiles = 0
+    if "profiles.index" not in file_names:
+        problems.append("no profiles.index")
+    else:
+        try:
+            profile_numbers = read_profile_numbers(path/"profiles.index")
+            num_profiles = len(profile_numbers)
+            missing = [num for num in profile_numbers if f"profile{num}.data" not in file_names]
+            if missing:
+                problems.append(f"{len(missing)} profile(s) listed in profiles.index are missing")
+        except Exception as e:
+            problems.append(f"profiles.index can't be read ({e})")
+
+    return history_file, num_profiles, problems
+
+
+
+def _validate_pack(pack):
+    problems = []
+    history_file = next((name for name in mesa_folder.HISTORY_FILE_NAMES if name in pack), None)
+    if history_file is None:
+        problems.append(f"{run_pack.PACK_FILE_NAME} has no history file")
+    num_profiles = 0
+    if "profiles.index" not in pack:
+        problems.append(f"{run_pack.PACK_FILE_NAME} has no profiles.index")
+    else:
+        profile_numbers = pack.profile_index().profile_numbers
+        num_profiles = len(profile_numbers)
+        missing = [num for num in profile_numbers if f"profile{num}.data" not in pack]
+        if missing:
+            problems.append(f"{len(missing)} profile(s) listed in profiles.index are missing from {run_pack.PACK_FILE_NAME}")
+    return history_file, num_profiles, problems
+
+
+
+
+
+class CatalogueScanner:
+
+    def __init__(self, root_dir, max_workers=8 if prefetch.THREADS_AVAILABLE else 0):
+        self.root_dir = Path(root_dir)
+        self.scan_path = self.root_dir/SCAN_FILE_NAME
+        self.max_workers = max_workers
+        self._cache = None # relative path -> RunStatus
+        self._lock = threading.Lock()
+
+
+
+    def _read_scan_file(self):
+        try:
+            with open(self.scan_path, "r") as f:
+                saved = json.load(f)
+            if saved["version"] != SCAN_FORMAT_VERSION:
+                return {}
+            return {path: RunStatus(**status) for path, status in saved["dirs"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+
+
+    # Best-effort, like the binary cache
+    def _write_scan_file(self):
+        saved = {"version": SCAN_FORMAT_VERSION, "dirs": {path: asdict(status) for path, status in self._cache.items()}}
+        tmp_path = self.scan_path.with_name(self.scan_path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.scan_path)
+        except (OSError, TypeError, ValueError):
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+
+    # List and validate a directory that is new or has changed since the last scan. Returns None if it has gone
+    def _scan_dir(self, relative_path, mtime_ns):
+        full_path = self.root_dir/relative_path
+        file_names = set()
+        subdirs = []
+        try:
+            with os.scandir(full_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file():
+                        file_names.add(entry.name)
+        except OSError:
+            return None
+
+        status = RunStatus(path=relative_path, mtime_ns=mtime_ns, subdirs=sorted(subdirs))
+        if any(name in file_names for name in RUN_MARKER_FILE_NAMES):
+            status.is_run = True
+            status.history_file, status.num_profiles, status.problems = validate_run(full_path, file_names)
+        return status
+
+
+
+    # Walk the whole tree and return the RunStatus of every folder that looks like a MESA run (valid or not), sorted by path
+    def scan(self):
+        with self._lock:
+            if self._cache is None:
+                self._cache = self._read_scan_file()
+
+            seen = {}
+            changed = False
+            frontier = ["."]
+            executor = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 0 else None
+            try:
+                while frontier:
+                    # An unchanged directory costs a stat() here; only the changed ones are listed, concurrently
+                    statuses = []
+                    rescan = []
+                    for relative_path in frontier:
+                        try:
+                            mtime_ns = os.stat(self.root_dir/relative_path).st_mtime_ns
+                        except OSError:
+                            continue
+                        cached = self._cache.get(relative_path)
+                        if cached is not None and cached.mtime_ns == mtime_ns:
+                            statuses.append(cached)
+                        else:
+                            rescan.append((relative_path, mtime_ns))
+
+                    scan_dir = lambda args: self._scan_dir(*args)
+                    for status in executor.map(scan_dir, rescan) if executor is not None else map(scan_dir, rescan):
+                        if status is None:
+                            continue
+                        # Only a difference counts: writing the scan/index files changes the mtime of the root directory every time
+                        cached = self._cache.get(status.path)
+                        changed = changed or cached is None or replace(cached, mtime_ns=status.mtime_ns) != status
+                        statuses.append(status)
+
+                    frontier = []
+                    for status in statuses:
+                        seen[status.path] = status
+                        frontier += [os.path.normpath(os.path.join(status.path, name)) for name in status.subdirs]
+                    frontier.sort()
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+
+            changed = changed or set(seen) != set(self._cache)
+            self._cache = seen
+            if changed:
+                self._write_scan_file()
+
+            return sorted((status for status in seen.values() if status.is_run), key=lambda status: status.path)
@@ -0,0 +1,203 @@
+import io
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+
+import mesa_reader as mr
+
+from . import binary_cache
+from . import lazy_data
+from . import mesa_folder
+
+
+
+
+
+# Files that belong in a MESA data folder. Anything else in an uploaded zip is skipped
+MESA_FILE_PATTERNS = [
+    re.compile(r"(trimmed_)?history\.data"),
+    re.compile(r"profile\d+\.data"),
+    re.compile(r"profiles\.index"),
+    re.compile(r"input\.txt"),
+    re.compile(r"inlist.*"),
+]
+
+# History columns the app relies on (see load_data.load_history)
+REQUIRED_HISTORY_COLUMNS = ["model_number", "star_age", "star_mass", "log_L", "log_Teff"]
+# Stage detection needs a few more (see data/stars/stage_detection.py DETECTION_COLUMNS). They are optional:
+# a history without them is still accepted, it just gets no stage highlighting
+
+# Refuse archives that would expand to more than this (protects against zip bombs)
+MAX_UNCOMPRESSED_BYTES = 4 * 1024**3
+
+# Copy members in chunks of this size, so no member is ever held in memory in full
+CHUNK_SIZE = 1024**2
+
+
+
+
+
+# Raised when an uploaded zip can't be turned into a MESA data folder. The message is meant to be shown to the user
+class IngestError(ValueError):
+    pass
+
+
+
+
+
+def is_mesa_file(name):
+    return any(pattern.fullmatch(name) for pattern in MESA_FILE_PATTERNS)
+
+
+
+
+
+# Errors zipfile raises while reading a damaged member: a bad CRC or header, corrupt or truncated compressed data,
+# or a compression method/encryption it doesn't support
+ZIP_READ_ERRORS = (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError)
+
+
+
+# Copy one member to disk chunk by chunk, checking the running total against the budget.
+# Counts the bytes actually written rather than trusting the sizes in the zip directory
+def _extract_member(zf, info, destination, budget):
+    written = 0
+    with open(destination, "wb") as f:
+        try:
+            with zf.open(info) as source:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > budget:
+                        raise IngestError(f"Archive expands to more than {MAX_UNCOMPRESSED_BYTES} bytes")
+                    f.write(chunk)
+        except ZIP_READ_ERRORS as e:
+            raise IngestError(f"{info.filename}: could not be extracted, the zip file may be damaged ({e})")
+    return written
+
+
+
+# Check the header of a history file, then write its binary cache
+def _ingest_history(path):
+    try:
+        history = lazy_data.LazyMesaData(path)
+    except Exception as e:
+        raise IngestError(f"{path.name}: could not read header ({e})")
+    missing = [name for name in REQUIRED_HISTORY_COLUMNS if name not in history.bulk_names]
+    if missing:
+        raise IngestError(f"{path.name}: missing required columns {missing}")
+    _build_cache(path)
+
+
+
+# Parse a history/profile file once and write its binary cache, so the app never has to parse the ASCII file again
+def _build_cache(path):
+    try:
+        store = binary_cache.load_store(path)
+    except Exception as e:
+        raise IngestError(f"{path.name}: could not be read as MESA data ({e})")
+    if store is None:
+        raise IngestError(f"{path.name}: contains non-numeric columns")
+    if store.num_rows == 0:
+        raise IngestError(f"{path.name}: contains no rows")
+
+
+
+# Check that profiles.index can be parsed and that every profile it lists was included in the zip
+def _validate_profile_index(folder):
+    try:
+        index = mr.MesaProfileIndex(str(folder/"profiles.index"))
+    except Exception as e:
+        raise IngestError(f"profiles.index: could not be read ({e})")
+    if len(index.profile_numbers) == 0:
+        raise IngestError("profiles.index: lists no profiles")
+    missing = [f"profile{num}.data" for num in index.profile_numbers if not (folder/f"profile{num}.data").is_file()]
+    if missing:
+        raise IngestError(f"profiles.index lists profiles missing from the zip: {', '.join(missing[:5])}{' ...' if len(missing) > 5 else ''}")
+
+
+
+
+
+# Turn an uploaded zip of a MESA run into a new data folder, target_dir/<zip name without .zip>.
+# zip_file can be the uploaded bytes or any file-like object; members are read one at a time in chunks.
+# Members are identified by file name only, so a top-level folder (or MESA's LOGS/ folder) inside the zip is
+# flattened away, and paths like "../x" can't write outside the new folder. Non-MESA files are skipped.
+# Everything is extracted and validated in a hidden staging folder, and the binary cache for the history and
+# every profile is written there too. Only once all of that succeeds is the staging folder renamed into place,
+# so a failed upload never leaves a half-extracted folder behind.
+# Returns (path of the new folder, list of skipped member names). Raises IngestError if the upload is rejected,
+# including when the zip turns out to be damaged or the folder can't be written (OSError while staging).
+def ingest_zip(zip_file, zip_name, target_dir):
+    if isinstance(zip_file, (bytes, bytearray)):
+        zip_file = io.BytesIO(zip_file)
+    target_dir = Path(target_dir)
+
+    if Path(zip_name).suffix.lower() != ".zip":
+        raise IngestError("filename must end in .zip (uploaded file should be a zipped MESA data folder)")
+    destination = target_dir / Path(zip_name).stem
+    if destination.exists():
+        raise IngestError(f"{destination} already exists")
+
+    try:
+        zf = zipfile.ZipFile(zip_file, "r")
+    except zipfile.BadZipFile as e:
+        raise IngestError(f"not a valid zip file ({e})")
+
+    try:
+        staging = Path(tempfile.mkdtemp(prefix=f".{destination.name}.", suffix=".ingest", dir=target_dir))
+    except OSError as e:
+        zf.close()
+        raise IngestError(f"could not create a folder in {target_dir} ({e})")
+    try:
+        with zf:
+            # Pick out the MESA members first, so nothing is extracted from an archive that is going to be rejected
+            members = {}
+            skipped = []
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = Path(info.filename.replace("\\", "/")).name
+                if not is_mesa_file(name):
+                    skipped.append(info.filename)
+                    continue
+                if name in members:
+                    raise IngestError(f"zip contains more than one {name}")
+                members[name] = info
+
+            if "profiles.index" not in members:
+                raise IngestError("zip contains no profiles.index")
+            history_names = [name for name in mesa_folder.HISTORY_FILE_NAMES if name in members]
+            if len(history_names) == 0:
+                raise IngestError(f"zip contains no history file ({' or '.join(mesa_folder.HISTORY_FILE_NAMES)})")
+            if sum(info.file_size for info in members.values()) > MAX_UNCOMPRESSED_BYTES:
+                raise IngestError(f"Archive expands to more than {MAX_UNCOMPRESSED_BYTES} bytes")
+
+            # Extract one member at a time, converting each data file to the binary cache straight away
+            budget = MAX_UNCOMPRESSED_BYTES
+            for name, info in members.items():
+                budget -= _extract_member(zf, info, staging/name, budget)
+                if name in history_names:
+                    _ingest_history(staging/name)
+                elif name.startswith("profile") and name.endswith(".data"):
+                    _build_cache(staging/name)
+
+        _validate_profile_index(staging)
+
+        # Same filesystem, so this is atomic: the folder appears complete or not at all
+        os.rename(staging, destination)
+
+    except OSError as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise IngestError(f"could not write {destination} ({e})")
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return destination, skipped
@@ -0,0 +1,178 @@
+import numpy as np
+import mesa_reader as mr
+
+from . import binary_cache
+
+
+
+
+
+# Parse only the header lines of an ASCII MESA file (same line layout that mr.MesaData assumes).
+# Returns (header_names, header_data, bulk_names)
+def read_header(file_name):
+    header_names = []
+    header_data = []
+    bulk_names = ()
+    with open(file_name, "r") as f:
+        for line_num, line in enumerate(f, start=1):
+            if line_num == mr.MesaData.header_names_line:
+                header_names = line.split()
+            elif line_num == mr.MesaData.header_names_line + 1:
+                header_data = [eval(datum) for datum in line.split()]
+            elif line_num == mr.MesaData.bulk_names_line:
+                bulk_names = tuple(line.split())
+                break
+    return header_names, dict(zip(header_names, header_data)), bulk_names
+
+
+
+
+
+# Drop-in replacement for mr.MesaData that only reads the header when it is created.
+# Each column is fetched the first time it is used (e.g. profile.h1 or profile.data("h1")) and then kept,
+# so a plot that uses 5 columns of a 150-column profile never converts the other 145.
+# Columns come from the binary cache (see binary_cache.py): if the cache is valid they are sliced out of a
+# memory-mapped block; if not, the first column access parses the ASCII file once and writes the cache.
+class LazyMesaData(mr.MesaData):
+
+    def __init__(self, file_name):
+        self.file_name = str(file_name)
+        self.file_type = "log"
+        self._store = None
+        self._columns = {}
+        self._bulk_data = None
+        self._fallback = None
+
+        # A valid cache already holds the header, so the ASCII file is never opened.
+        # Raises FileNotFoundError if the file doesn't exist, same as mr.MesaData
+        store = binary_cache.read_cached_store(self.file_name)
+        if store is not None:
+            self._store = store
+            self.header_names = list(store.header_names)
+            self.header_data = dict(store.header_data)
+            self.bulk_names = store.bulk_names
+        else:
+            self._read_header()
+
+
+
+    # Create from a ColumnStore that is already open (e.g. one out of a run pack, see run_pack.py), without touching file_name
+    @classmethod
+    def from_store(cls, file_name, store):
+        lazy = cls.__new__(cls)
+        lazy.__dict__.update(file_name=str(file_name), file_type="log", _store=store, _columns={}, _bulk_data=None, _fallback=None)
+        lazy.header_names = list(store.header_names)
+        lazy.header_data = dict(store.header_data)
+        lazy.bulk_names = store.bulk_names
+        return lazy
+
+
+
+    def _read_header(self):
+        self.header_names, self.header_data, self.bulk_names = read_header(self.file_name)
+
+
+
+    # Load the binary cache (building it from the ASCII file if needed), without converting any columns yet.
+    # Happens automatically the first time a column is used; call it directly to do the slow part ahead of time
+    def load(self):
+        if self._store is None and self._fallback is None and self._bulk_data is None:
+            self._store = binary_cache.load_store(self.file_name)
+            if self._store is None:
+                self._fallback = mr.MesaData(self.file_name) # File can't be cached; read it the normal way
+
+
+
+    # Fetch one column, loading the binary cache (or building it) the first time any column is needed
+    def _column(self, name):
+        if self._bulk_data is not None:
+            return self._bulk_data[name]
+        if name in self._columns:
+            return self._columns[name]
+
+        self.load()
+
+        if self._store is not None:
+            values = self._store.column(name)
+        else:
+            values = self._fallback.data(name)
+
+        self._columns[name] = values
+        return values
+
+
+
+    # Columns that have been fetched so far
+    @property
+    def loaded_columns(self):
+        return list(self._columns.keys())
+
+
+
+    # Bytes of NumPy data this object is holding: the store's column block (memory-mapped from the binary cache or read
+    # into memory, either way it keeps a mapping or the data itself alive), the columns fetched so far that aren't views of
+    # the store, plus the full structured array if it has been built (or read by the mr.MesaData fallback)
+    @property
+    def nbytes(self):
+        nbytes = 0
+        store_columns = self._store.columns if self._store is not None else None
+        if store_columns is not None:
+            nbytes += store_columns.nbytes
+        for values in self._columns.values():
+            if store_columns is not None and np.may_share_memory(values, store_columns):
+                continue
+            nbytes += values.nbytes
+        if self._bulk_data is not None:
+            nbytes += self._bulk_data.nbytes
+        if self._fallback is not None:
+            nbytes += self._fallback.bulk_data.nbytes
+        return nbytes
+
+
+
+    # Full structured array, for code that reaches into bulk_data directly. Only built if someone asks for it
+    @property
+    def bulk_data(self):
+        if self._bulk_data is None:
+            bulk_data = np.empty(
+                len(self._column(self.bulk_names[0])),
+                dtype=[(name, self._column(name).dtype) for name in self.bulk_names])
+            for name in self.bulk_names:
+                bulk_data[name] = self._column(name)
+            self._bulk_data = bulk_data
+        return self._bulk_data
+
+    @bulk_data.setter
+    def bulk_data(self, value):
+        self._bulk_data = value
+
+
+
+    # Same lookup rules as mr.MesaData.data (including the log_/ln_ conversions), but one column at a time
+    def data(self, key):
+        if self.in_data(key):
+            return self._column(key)
+        elif self._log_version(key) is not None:
+            return 10 ** self._column(self._log_version(key))
+        elif self._ln_version(key) is not None:
+            return np.exp(self._column(self._ln_version(key)))
+        elif self._exp10_version(key) is not None:
+            return np.log10(self._column(self._exp10_version(key)))
+        elif self._exp_version(key) is not None:
+            return np.log(self._column(self._exp_version(key)))
+        else:
+            raise KeyError("'" + str(key) + "' is not a valid data type.")
+
+
+
+    # mr.MesaData pickles as (file_name, bulk_data, bulk_names, header_data, header_names).
+    # Set up the lazy fields first, so that __getattr__ doesn't recurse while the state is being restored
+    def __setstate__(self, state):
+        self.__dict__.update(file_type="log", _store=None, _columns={}, _bulk_data=None, _fallback=None)
+        (
+            self.file_name,
+            self.bulk_data,
+            self.bulk_names,
+            self.header_data,
+            self.header_names,
+        ) = state
@@ -0,0 +1,173 @@
+import io
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import mesa_reader as mr
+
+from . import binary_cache
+from . import lazy_data
+
+
+
+
+
+# Keeps up with a MESA run that is still being computed: each update() only parses what MESA has written since the last one.
+# history.data: remembers the byte offset just past the last complete row, and parses only the rows after it.
+# profiles.index: the same, checking first that the last entry it has seen is still where it was (MESA rewrites the whole file).
+# If a file shrinks or is replaced (a new run started in the same folder), or profiles.index is rewritten (a restart),
+# it is read again from the start, and update() sets restarted: profiles already loaded may no longer be the ones on disk.
+class LiveRun:
+
+    def __init__(self, history_path, profile_index_path):
+        self.history_path = Path(history_path)
+        self.profile_index_path = Path(profile_index_path)
+        self.restarted = False # Whether the last update() had to start over on either file
+        self._reset_history()
+        self._reset_profile_index()
+
+
+
+    def _reset_history(self):
+        self._history_offset = 0
+        self._history_inode = None
+        self._header_names = None
+        self._header_data = None
+        self._bulk_names = None
+        self._dtypes = None
+        self._columns = None # (num_columns, num_rows) float64, after backups/restarts are removed
+
+
+
+    def _reset_profile_index(self):
+        self._profile_index_offset = 0
+        self._profile_index_inode = None
+        self._profile_index_last_line = b"" # Bytes of the last line parsed, which end at _profile_index_offset
+        self._profile_index_rows = np.empty((0, len(mr.MesaProfileIndex.index_names)), dtype=int)
+
+
+
+    # Returns (history changed, profiles.index changed)
+    def update(self):
+        self.restarted = False
+        return self._update_history(), self._update_profile_index()
+
+
+
+    def _update_history(self):
+        stat = os.stat(self.history_path)
+        reset = self._columns is None or stat.st_ino != self._history_inode or stat.st_size < self._history_offset
+        if reset:
+            self.restarted = self.restarted or self._columns is not None # The first read isn't a restart
+            self._reset_history()
+            self._history_inode = stat.st_ino
+            self._header_names, self._header_data, self._bulk_names = lazy_data.read_header(self.history_path)
+            with open(self.history_path, "rb") as f:
+                for _ in range(mr.MesaData.bulk_names_line):
+                    f.readline()
+                self._history_offset = f.tell()
+            self._columns = np.empty((len(self._bulk_names), 0), dtype=np.float64)
+
+        if stat.st_size == self._history_offset:
+            return reset
+
+        # Only take complete lines: MESA may be halfway through writing the last one
+        with open(self.history_path, "rb") as f:
+            f.seek(self._history_offset)
+            appended = f.read(stat.st_size - self._history_offset)
+        appended = appended[:appended.rfind(b"\n")+1]
+        if len(appended.strip()) == 0:
+            return reset
+        self._history_offset += len(appended)
+
+        rows = pd.read_csv(io.BytesIO(appended), sep=r"\s+", header=None, names=self._bulk_names)
+        if self._dtypes is None:
+            self._dtypes = [rows[name].dtype if rows[name].dtype.kind in "biuf" else np.dtype(np.float64) for name in self._bulk_names]
+        new_columns = rows.to_numpy(dtype=np.float64).T
+        self._columns = _remove_backups(np.concatenate([self._columns, new_columns], axis=1), self._bulk_names.index("model_number"))
+        return True
+
+
+
+    def _update_profile_index(self):
+        if not self.profile_index_path.is_file():
+            return False
+        stat = os.stat(self.profile_index_path)
+        with open(self.profile_index_path, "rb") as f:
+            # profiles.index is rewritten after a restart, so entries can disappear or change; start over if they did.
+            # Entries are only ever appended otherwise, so it is enough to check the last one seen
+            reset = stat.st_ino != self._profile_index_inode or stat.st_size < self._profile_index_offset
+            if not reset:
+                f.seek(self._profile_index_offset - len(self._profile_index_last_line))
+                reset = f.read(len(self._profile_index_last_line)) != self._profile_index_last_line
+            restarted = reset and self._profile_index_inode is not None # The first read isn't a restart
+            if reset:
+                self.restarted = self.restarted or restarted
+                self._reset_profile_index()
+                self._profile_index_inode = stat.st_ino
+                f.seek(0)
+                for _ in range(mr.MesaProfileIndex.index_start_line-1):
+                    f.readline()
+                self._profile_index_offset = f.tell()
+
+            # Only take complete lines: MESA may be halfway through writing the last one
+            f.seek(self._profile_index_offset)
+            appended = f.read(max(stat.st_size - self._profile_index_offset, 0))
+        appended = appended[:appended.rfind(b"\n")+1]
+        if len(appended) == 0:
+            return restarted
+        self._profile_index_offset += len(appended)
+        self._profile_index_last_line = appended[appended.rfind(b"\n", 0, len(appended)-1)+1:]
+
+        new_lines = [line.split() for line in appended.splitlines() if line.strip()]
+        if len(new_lines) == 0:
+            return restarted
+        new_rows = np.array(new_lines, dtype=int)
+        self._profile_index_rows = np.concatenate([self._profile_index_rows, new_rows])
+        return True
+
+
+
+    # History as a ColumnStore (densified like a cached one if it was thinned, see binary_cache.densify_model_numbers)
+    def history_store(self):
+        store = binary_cache.ColumnStore(
+            bulk_names=self._bulk_names,
+            dtypes=self._dtypes if self._dtypes is not None else [np.float64]*len(self._bulk_names),
+            columns=self._columns,
+            header_names=self._header_names,
+            header_data=self._header_data)
+        return binary_cache.densify_model_numbers(store)
+
+
+
+    # profiles.index as an mr.MesaProfileIndex (sorted by model number, same as mesa_reader does).
+    # Profiles for models the history doesn't have (yet, or any more after a restart) are left out
+    def profile_index(self):
+        rows = self._profile_index_rows[np.argsort(self._profile_index_rows[:, 0], kind="stable")]
+        if self._columns is not None and self._columns.shape[1] > 0:
+            rows = rows[rows[:, 0] <= self._columns[self._bulk_names.index("model_number"), -1]]
+        profile_index = mr.MesaProfileIndex.__new__(mr.MesaProfileIndex)
+        profile_index.file_name = str(self.profile_index_path)
+        profile_index.model_number_string = mr.MesaProfileIndex.index_names[0]
+        profile_index.profile_number_string = mr.MesaProfileIndex.index_names[-1]
+        profile_index.index_data = {name: rows[:, i] for i, name in enumerate(mr.MesaProfileIndex.index_names)}
+        profile_index.model_numbers = profile_index.index_data[profile_index.model_number_string]
+        profile_index.profile_numbers = profile_index.index_data[profile_index.profile_number_string]
+        return profile_index
+
+
+
+
+
+# Drop rows left behind by backups/restarts, same rule as mr.MesaData.remove_backups:
+# a row is only kept if its model number is smaller than every model number after it
+def _remove_backups(columns, model_number_index):
+    model_numbers = columns[model_number_index]
+    if len(model_numbers) < 2:
+        return columns
+    later_min = np.minimum.accumulate(model_numbers[::-1])[::-1]
+    keep = np.append(model_numbers[:-1] < later_min[1:], True)
+    if np.all(keep):
+        return columns
+    return columns[:, keep]
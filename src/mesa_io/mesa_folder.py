@@ -0,0 +1,167 @@
+from functools import lru_cache
+from pathlib import Path
+
+import mesa_reader as mr
+
+from . import lazy_data
+from . import live_run
+from . import run_pack
+
+
+
+
+
+# History file names, in order of preference
+HISTORY_FILE_NAMES = ["history.data", "trimmed_history.data"]
+
+
+
+
+
+# One handle per MESA folder. Owns the history, the parsed profiles.index and the profile lookup,
+# so the history and the index are each read at most once no matter how many profiles are loaded.
+# If the folder has an up-to-date run.mesapack (see run_pack.py), everything is read from that instead of the loose files.
+# Use get_folder() rather than creating these directly, so every caller shares the same handle.
+class MesaFolder:
+
+    def __init__(self, MESA_folder_path):
+        self.path = Path(MESA_folder_path)
+        self._history = None
+        self._profile_index = None
+        self._pack = None
+        self._pack_checked = False
+        self._live_run = None
+        self.revision = 0 # Goes up every time refresh() picks up new data
+        self.restarted = False # Whether the last refresh() found the run had been restarted (see live_run.py)
+
+
+
+    # Packed copy of the folder, or None if there isn't a usable one. Checked the first time it is needed
+    @property
+    def pack(self):
+        if not self._pack_checked:
+            self._pack = run_pack.open_pack(self.path)
+            self._pack_checked = True
+        return self._pack
+
+
+
+    # Store for one of the folder's data files out of the pack, or None if it isn't packed
+    def _packed_store(self, name):
+        if self.pack is not None and name in self.pack and self.pack.toc["files"][name]["kind"] == "table":
+            return self.pack.store(name)
+        return None
+
+
+
+    # Path to the history file (history.data if present, otherwise trimmed_history.data).
+    # With a pack, the file only has to exist in the pack
+    @property
+    def history_path(self):
+        for name in HISTORY_FILE_NAMES:
+            if (self.path/name).is_file() or (self.pack is not None and name in self.pack):
+                return self.path/name
+        raise FileNotFoundError(f"No history file ({' or '.join(HISTORY_FILE_NAMES)}) found in '{self.path}'")
+
+
+
+    # History file, read the first time it is needed
+    @property
+    def history(self):
+        if self._history is None:
+            history_path = self.history_path
+            store = self._packed_store(history_path.name)
+            if store is not None:
+                self._history = lazy_data.LazyMesaData.from_store(history_path, store)
+            else:
+                self._history = lazy_data.LazyMesaData(history_path)
+        return self._history
+
+
+
+    # profiles.index, read the first time it is needed
+    @property
+    def profile_index(self):
+        if self._profile_index is None:
+            if self.pack is not None and "profiles.index" in self.pack:
+                self._profile_index = self.pack.profile_index()
+            else:
+                self._profile_index = mr.MesaProfileIndex(str(self.path/"profiles.index"))
+        return self._profile_index
+
+
+
+    # Sorted array of model numbers that have a saved profile
+    @property
+    def model_numbers(self):
+        return self.profile_index.model_numbers
+
+
+
+    def profile_path(self, modelnum):
+        profilenum = self.profile_index.profile_with_model_number(modelnum)
+        return self.path/f"profile{profilenum}.data"
+
+
+
+    # Contents of one of the folder's text files (e.g. "input.txt"), from the folder or else from the pack
+    def read_text(self, name):
+        if (self.path/name).is_file():
+            return (self.path/name).read_text()
+        if self.pack is not None and name in self.pack:
+            return self.pack.read_text(name)
+        raise FileNotFoundError(f"No {name} found in '{self.path}'")
+
+
+
+    # For a run that is still being computed: pick up the history rows and profiles MESA has written since the last refresh,
+    # parsing only the new part of history.data and profiles.index (see live_run.py). Returns True if anything changed.
+    # The first refresh reads the history once from the start. Packed runs are finished, so they never change.
+    # After a restart, profiles loaded before it are stale; restarted tells the caller to drop them (see load_data.refresh_run)
+    def refresh(self):
+        self.restarted = False
+        if self.pack is not None:
+            return False
+        if self._live_run is None:
+            self._live_run = live_run.LiveRun(self.history_path, self.path/"profiles.index")
+
+        history_changed, profile_index_changed = self._live_run.update()
+        self.restarted = self._live_run.restarted
+        if history_changed:
+            self._history = lazy_data.LazyMesaData.from_store(self._live_run.history_path, self._live_run.history_store())
+        if history_changed or profile_index_changed:
+            self._profile_index = self._live_run.profile_index()
+        if history_changed or profile_index_changed:
+            self.revision += 1
+            return True
+        return False
+
+
+
+    def profile_data(self, modelnum):
+        profile_path = self.profile_path(modelnum)
+        store = self._packed_store(profile_path.name)
+        if store is not None:
+            return lazy_data.LazyMesaData.from_store(profile_path, store)
+        return lazy_data.LazyMesaData(profile_path)
+
+
+
+    # profile_data with its column block already loaded (see LazyMesaData.load), so a cache that holds it
+    # (see profile_cache.py) measures it at the size it will have once it is used
+    def loaded_profile_data(self, modelnum):
+        profile = self.profile_data(modelnum)
+        profile.load()
+        return profile
+
+
+
+
+
+# Shared registry of folder handles, keyed by path
+def get_folder(MESA_folder_path):
+    return _get_folder(Path(MESA_folder_path))
+
+@lru_cache(maxsize=64)
+def _get_folder(MESA_folder_path):
+    return MesaFolder(MESA_folder_path)
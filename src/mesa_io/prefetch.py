@@ -0,0 +1,97 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import mesa_folder
+
+
+
+
+
+# The browser (Pyodide) build has no threads, so prefetching is off there by default
+THREADS_AVAILABLE = sys.platform != "emscripten"
+
+
+
+
+
+# Loads the profiles next to the one being viewed on a background thread pool, so that stepping
+# through a run one model at a time finds the next profile already in the profile cache.
+# depth: how many saved models to load on each side of the current one
+# max_workers: number of background threads (0 turns prefetching off)
+class Prefetcher:
+
+    def __init__(self, cache, depth=1, max_workers=2 if THREADS_AVAILABLE else 0):
+        self.cache = cache
+        self.depth = depth
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = {} # (folder path, modelnum) -> Future, for loads that are queued or running
+        self._lock = threading.RLock() # Re-entrant: cancelling a future runs its done callback straight away
+
+
+
+    # Model numbers within depth of modelnum in model_numbers, nearest first (next, previous, 2nd next, 2nd previous, ...)
+    def neighbors(self, modelnum, model_numbers):
+        model_numbers = list(model_numbers)
+        if modelnum not in model_numbers:
+            return []
+        i = model_numbers.index(modelnum)
+        neighbors = []
+        for offset in range(1, self.depth+1):
+            for j in [i+offset, i-offset]:
+                if 0 <= j < len(model_numbers):
+                    neighbors.append(model_numbers[j])
+        return neighbors
+
+
+
+    # Queue the neighbors of modelnum for loading. Returns immediately.
+    # Loads that are already queued or running aren't queued again, and queued loads for models that are no longer
+    # neighbors (because the user has moved on) are cancelled before they start
+    def prefetch(self, MESA_folder_path, modelnum, model_numbers):
+        if self.max_workers <= 0 or self.depth <= 0:
+            return
+
+        folder = mesa_folder.get_folder(MESA_folder_path)
+        wanted = [(folder.path, int(neighbor)) for neighbor in self.neighbors(modelnum, model_numbers)]
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="profile-prefetch")
+
+            for key, future in list(self._pending.items()):
+                if key not in wanted:
+                    future.cancel() # If it hadn't started yet, its done callback removes it from _pending
+
+            for key in wanted:
+                if key not in self._pending:
+                    future = self._executor.submit(self._load, folder, key[1])
+                    future.add_done_callback(lambda future, key=key: self._done(key, future))
+                    self._pending[key] = future
+
+
+
+    # Put the profile in the cache and build/open its binary cache, which is the slow part of a first load.
+    # Errors are ignored here; they show up again if the user actually selects that profile
+    def _load(self, folder, modelnum):
+        try:
+            self.cache.get(folder.path, modelnum, lambda: folder.loaded_profile_data(modelnum))
+        except Exception:
+            pass
+
+
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
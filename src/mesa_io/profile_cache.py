@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+
+
+
+
+# Default memory budget for loaded profiles
+DEFAULT_MAX_BYTES = 256 * 1024**2
+
+# Default cap on the number of profiles kept, whatever their size. Each loaded profile holds an open memory map of its
+# binary cache, so this also bounds the file descriptors and mappings a long-running server keeps open
+DEFAULT_MAX_ENTRIES = 128
+
+
+
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+    max_entries: int
+
+
+
+
+
+# Least-recently-used cache of loaded profiles, keyed by (MESA folder, model number) and bounded by memory, with a cap on
+# the number of entries as well. Each entry's size (its nbytes, see lazy_data.py) is measured when it is added and measured
+# again whenever it is used, since that is when a profile can have loaded more columns; the least recently used profiles
+# are dropped until the total is back under max_bytes and there are at most max_entries. The most recently used profile
+# is always kept.
+# One cache is shared by every session in the server process, so all access goes through a lock.
+class ProfileCache:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._sizes = {} # key -> nbytes of the entry when it was last measured
+        self._nbytes = 0 # Sum of _sizes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+
+    @staticmethod
+    def _key(MESA_folder_path, modelnum):
+        return Path(MESA_folder_path), int(modelnum)
+
+
+
+    # Return the cached profile, or call load() to create it and add it to the cache
+    def get(self, MESA_folder_path, modelnum, load):
+        key = self._key(MESA_folder_path, modelnum)
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                self._measure(key)
+                self._evict()
+                return self._entries[key]
+            self._misses += 1
+
+        # Load outside the lock so one slow read doesn't block every other session.
+        # If two callers load the same profile at once, the first one stored wins
+        profile = load()
+
+        with self._lock:
+            profile = self._entries.setdefault(key, profile)
+            self._entries.move_to_end(key)
+            self._measure(key)
+            self._evict()
+        return profile
+
+
+
+    # Update the recorded size of one entry. Call with the lock held
+    def _measure(self, key):
+        nbytes = self._entries[key].nbytes
+        self._nbytes += nbytes - self._sizes.get(key, 0)
+        self._sizes[key] = nbytes
+
+
+
+    # Remove one entry. Call with the lock held
+    def _remove(self, key):
+        del self._entries[key]
+        self._nbytes -= self._sizes.pop(key, 0)
+        self._evictions += 1
+
+
+
+    # Drop least recently used entries until the cache fits in max_bytes and max_entries. Call with the lock held
+    def _evict(self):
+        while (self._nbytes > self.max_bytes or len(self._entries) > self.max_entries) and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+
+
+
+    # Drop every profile of one folder (e.g. a live run that has been restarted, so its profile files have been rewritten)
+    def evict_folder(self, MESA_folder_path):
+        folder_path = Path(MESA_folder_path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == folder_path]:
+                self._remove(key)
+
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+
+
+
+    @property
+    def stats(self):
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                nbytes=self._nbytes,
+                max_bytes=self.max_bytes,
+                max_entries=self.max_entries)
@@ -0,0 +1,303 @@
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field, asdict, fields
+from functools import lru_cache
+from pathlib import Path
+
+from . import binary_cache
+from . import catalogue_scan
+from . import mesa_folder
+from . import run_pack
+
+
+
+
+
+# Index file kept in each directory of runs, holding the parsed metadata of every run folder in it
+INDEX_FILE_NAME = ".mesa_index.json"
+
+# Bump this whenever RunMetadata or the parsing changes, so old index files are rebuilt
+INDEX_FORMAT_VERSION = 3
+
+# Files the metadata is read from
+METADATA_FILE_NAMES = ["input.txt", "inlist"]
+
+
+
+
+
+# What a run was computed with, read from its input.txt (written by MESA-Web) and inlist.
+# Values are None when neither file says.
+@dataclass
+class RunMetadata:
+    folder: str
+    initial_mass: float = None
+    initial_z: float = None
+    mixing_length_alpha: float = None
+    overshoot_f: float = None
+    overshoot_f0: float = None
+    network: str = None
+    mesa_release: str = None
+    completed: bool = None
+    input_params: dict = field(default_factory=dict) # Every "Name: value" line of input.txt
+    inlist_params: dict = field(default_factory=dict) # Every "name = value" of inlist (all namelists together)
+
+
+    @property
+    def name(self):
+        return Path(self.folder).name
+
+
+    # Short row for tables in the app
+    def table_row(self):
+        return {
+            "folder": self.name,
+            "mass (Msun)": self.initial_mass,
+            "Z": self.initial_z,
+            "alpha_MLT": self.mixing_length_alpha,
+            "overshoot f": self.overshoot_f,
+            "network": self.network,
+            "MESA release": self.mesa_release,
+            "path": self.folder,
+        }
+
+
+
+
+
+# "Initial Mass: 1.0 (solar mass)" -> {"Initial Mass": "1.0 (solar mass)"}
+def parse_input_txt(text):
+    params = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not key.startswith(("Job", "-")) and value.strip():
+            params[key.strip()] = value.strip()
+    return params
+
+
+
+# Fortran namelist value -> Python value (.true. -> True, 1d-3 -> 0.001, 'Cox' -> "Cox")
+def _parse_fortran_value(value):
+    value = value.strip().rstrip(",")
+    if value.lower() in (".true.", "t"):
+        return True
+    if value.lower() in (".false.", "f"):
+        return False
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value.lower().replace("d", "e"))
+    except ValueError:
+        return value
+
+
+
+# Strip a "!" comment, ignoring "!" inside quotes
+def _strip_comment(line):
+    quote = None
+    for i, char in enumerate(line):
+        if char in "'\"":
+            quote = None if quote == char else (quote or char)
+        elif char == "!" and quote is None:
+            return line[:i]
+    return line
+
+
+
+# "initial_mass = 1.0 ! in Msun units" -> {"initial_mass": 1.0}. Keys are lower case, since Fortran ignores case
+def parse_inlist(text):
+    params = {}
+    for line in text.splitlines():
+        line = _strip_comment(line).strip()
+        if line.startswith(("&", "/")) or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        params[key.strip().lower()] = _parse_fortran_value(value)
+    return params
+
+
+
+# Leading number of an input.txt value ("1.0 (solar mass)" -> 1.0)
+def _leading_float(value):
+    if value is None:
+        return None
+    match = re.match(r"\s*([-+]?[0-9.]+(?:[eEdD][-+]?\d+)?)", value)
+    return float(match.group(1).lower().replace("d", "e")) if match else None
+
+
+
+
+
+# Read the metadata of one run folder (loose files or a run pack)
+def read_run_metadata(MESA_folder_path):
+    folder = mesa_folder.get_folder(MESA_folder_path)
+    texts = {}
+    for name in METADATA_FILE_NAMES:
+        try:
+            texts[name] = folder.read_text(name)
+        except (FileNotFoundError, KeyError):
+            texts[name] = ""
+
+    input_params = parse_input_txt(texts["input.txt"])
+    inlist_params = parse_inlist(texts["inlist"])
+
+    # input.txt first, since it is what MESA-Web actually ran with; inlist otherwise
+    def number(input_key, inlist_key):
+        value = _leading_float(input_params.get(input_key))
+        if value is None and isinstance(inlist_params.get(inlist_key), (int, float)):
+            value = float(inlist_params[inlist_key])
+        return value
+
+    network = input_params.get("Nuclear Reaction Network", inlist_params.get("new_net_name"))
+    completed = None
+    if texts["input.txt"]:
+        completed = "did not complete" not in texts["input.txt"]
+
+    return RunMetadata(
+        folder=str(folder.path),
+        initial_mass=number("Initial Mass", "initial_mass"),
+        initial_z=number("Initial Metallicity", "initial_z"),
+        mixing_length_alpha=number("Mixing Length Alpha", "mixing_length_alpha"),
+        overshoot_f=number("Convective Overshoot f", "overshoot_f(1)"),
+        overshoot_f0=number("Convective Overshoot f0", "overshoot_f0(1)"),
+        network=network,
+        mesa_release=input_params.get("MESA Release"),
+        completed=completed,
+        input_params=input_params,
+        inlist_params=inlist_params)
+
+
+
+
+
+# Size/mtime of the files a run's metadata comes from, used to tell whether the index entry is still current
+def _metadata_signature(path):
+    signature = {}
+    for name in METADATA_FILE_NAMES + [run_pack.PACK_FILE_NAME]:
+        try:
+            signature[name] = binary_cache.source_signature(path/name)
+        except FileNotFoundError:
+            signature[name] = None
+    return signature
+
+
+
+
+
+# Metadata of every valid run folder under root_dir (found by catalogue_scan.CatalogueScanner), kept in root_dir/.mesa_index.json.
+# Each run's input.txt/inlist is parsed once; after that it is only parsed again if those files change (size/mtime),
+# including when they are edited in place. Directory mtimes only decide which folders the scanner lists again,
+# so runs that have been added or removed since the last scan are picked up by runs()/query().
+class MetadataIndex:
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+        self.index_path = self.root_dir/INDEX_FILE_NAME
+        self.scanner = catalogue_scan.CatalogueScanner(self.root_dir)
+        self.invalid_runs = [] # RunStatus of run folders that can't be loaded, as of the last runs()
+        self._entries = None # relative path -> {"signature": ..., "metadata": RunMetadata}
+        self._lock = threading.Lock()
+
+
+
+    def _read_index_file(self):
+        try:
+            with open(self.index_path, "r") as f:
+                saved = json.load(f)
+            if saved["version"] != INDEX_FORMAT_VERSION:
+                return {}
+            known = {f.name for f in fields(RunMetadata)}
+            return {
+                name: {"signature": entry["signature"], "metadata": RunMetadata(**{k: v for k, v in entry["metadata"].items() if k in known})}
+                for name, entry in saved["runs"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+
+
+    # Write the index to disk. Best-effort, like the binary cache: a read-only folder just means re-parsing next time
+    def _write_index_file(self):
+        saved = {
+            "version": INDEX_FORMAT_VERSION,
+            "runs": {name: {"signature": entry["signature"], "metadata": asdict(entry["metadata"])} for name, entry in self._entries.items()},
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.index_path)
+        except (OSError, TypeError, ValueError):
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+
+    # Bring the index up to date with the folders on disk. Returns the list of RunMetadata, sorted by initial mass then name
+    def runs(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read_index_file()
+
+            statuses = self.scanner.scan()
+            self.invalid_runs = [status for status in statuses if not status.valid]
+
+            changed = False
+            present = set()
+            for status in statuses:
+                if not status.valid:
+                    continue
+                present.add(status.path)
+                signature = _metadata_signature(self.root_dir/status.path)
+                entry = self._entries.get(status.path)
+                if entry is None or entry["signature"] != signature:
+                    self._entries[status.path] = {"signature": signature, "metadata": read_run_metadata(self.root_dir/status.path)}
+                    changed = True
+
+            for name in set(self._entries) - present:
+                del self._entries[name]
+                changed = True
+
+            if changed:
+                self._write_index_file()
+
+            return sorted(
+                (entry["metadata"] for entry in self._entries.values()),
+                key=lambda run: (run.initial_mass is None, run.initial_mass or 0, run.name))
+
+
+
+    # Runs matching every filter that is given, e.g. query(min_mass=1, max_mass=3, z=0.02).
+    # Masses are inclusive. z matches to within z_rtol. Any other keyword is compared to the RunMetadata field of that name
+    def query(self, min_mass=None, max_mass=None, z=None, z_rtol=1e-6, **equals):
+        matches = []
+        for run in self.runs():
+            if min_mass is not None and (run.initial_mass is None or run.initial_mass < min_mass):
+                continue
+            if max_mass is not None and (run.initial_mass is None or run.initial_mass > max_mass):
+                continue
+            if z is not None and (run.initial_z is None or abs(run.initial_z - z) > z_rtol*abs(z)):
+                continue
+            if any(getattr(run, key) != value for key, value in equals.items()):
+                continue
+            matches.append(run)
+        return matches
+
+
+
+
+
+# Shared index per directory, so every session reuses the same parsed metadata
+def get_index(root_dir):
+    return _get_index(Path(root_dir))
+
+@lru_cache(maxsize=16)
+def _get_index(root_dir):
+    return MetadataIndex(root_dir)
@@ -0,0 +1,184 @@
+import io
+import json
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+import mesa_reader as mr
+
+from . import binary_cache
+
+
+
+
+
+# A whole MESA run packed into one file, so opening a run is one open() and one mmap instead of a parse per file.
+# Layout:
+#     [8 bytes magic][uint64 offset of the table of contents]
+#     [the packed files, one after the other: history/profiles as (num_columns, num_rows) float64 column blocks,
+#      each starting on a BLOCK_ALIGNMENT boundary; everything else as raw text]
+#     [table of contents: UTF-8 JSON]
+# The table of contents maps each packed file name (e.g. "profile3.data") to its offset in the pack, plus what is
+# needed to rebuild it: for history/profile files the same fields as a binary_cache sidecar, for text files
+# (profiles.index, input.txt, inlist) just the size. It also records the size/mtime of every file that went in,
+# so a pack sitting next to loose files that have changed since is ignored.
+PACK_FILE_NAME = "run.mesapack"
+PACK_MAGIC = b"MESAPAK1"
+PACK_FORMAT_VERSION = 1
+BLOCK_ALIGNMENT = 64
+
+_HEADER = struct.Struct("<8sQ")
+
+# Files that go in a pack, and which of them are MESA data tables (the rest are stored as text)
+PACKED_FILE_PATTERN = re.compile(r"(trimmed_)?history\.data|profile\d+\.data|profiles\.index|input\.txt|inlist.*")
+TABLE_FILE_PATTERN = re.compile(r"(trimmed_)?history\.data|profile\d+\.data")
+
+
+
+
+
+# Read-only view of a pack file. Column blocks are slices of a single memory map of the whole file
+class RunPack:
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, toc_offset = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{self.path} is not a MESA run pack")
+            f.seek(toc_offset)
+            self.toc = json.loads(f.read().decode("utf-8"))
+        if self.toc["version"] != PACK_FORMAT_VERSION:
+            raise ValueError(f"{self.path} was written by an incompatible version ({self.toc['version']})")
+        self._buffer = np.memmap(self.path, dtype=np.uint8, mode="r")
+
+
+
+    @property
+    def file_names(self):
+        return list(self.toc["files"].keys())
+
+
+
+    def __contains__(self, name):
+        return name in self.toc["files"]
+
+
+
+    # True if every packed file that still exists next to the pack is unchanged since it was packed.
+    # Files that have been deleted are fine: a pack can be shipped on its own
+    def matches_folder(self, folder):
+        folder = Path(folder)
+        for name, signature in self.toc["source"].items():
+            try:
+                if binary_cache.source_signature(folder/name) != signature:
+                    return False
+            except FileNotFoundError:
+                pass
+        return True
+
+
+
+    # ColumnStore for a packed history/profile, with columns memory-mapped straight out of the pack
+    def store(self, name):
+        entry = self.toc["files"][name]
+        if entry["kind"] != "table":
+            raise ValueError(f"{name} is not a data table")
+        num_columns, num_rows = len(entry["bulk_names"]), entry["num_rows"]
+        columns = self._buffer[entry["offset"] : entry["offset"] + 8*num_columns*num_rows].view(np.float64).reshape(num_columns, num_rows)
+        return binary_cache.ColumnStore(
+            bulk_names=entry["bulk_names"],
+            dtypes=entry["dtypes"],
+            columns=columns,
+            header_names=entry["header_names"],
+            header_data=entry["header_data"])
+
+
+
+    def read_text(self, name):
+        entry = self.toc["files"][name]
+        if entry["kind"] != "text":
+            raise ValueError(f"{name} is not a text file")
+        return bytes(self._buffer[entry["offset"] : entry["offset"] + entry["size"]]).decode("utf-8")
+
+
+
+    # mr.MesaProfileIndex built from the packed profiles.index text
+    def profile_index(self):
+        profile_index = mr.MesaProfileIndex.__new__(mr.MesaProfileIndex)
+        profile_index.file_name = io.StringIO(self.read_text("profiles.index"))
+        profile_index.read_index()
+        profile_index.file_name = str(self.path.parent/"profiles.index")
+        return profile_index
+
+
+
+
+
+# Pack file for a folder, or None if there isn't a usable one
+def open_pack(MESA_folder_path):
+    path = Path(MESA_folder_path)/PACK_FILE_NAME
+    if not path.is_file():
+        return None
+    try:
+        pack = RunPack(path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    if not pack.matches_folder(MESA_folder_path):
+        return None
+    return pack
+
+
+
+
+
+# Pack every MESA file in a folder into <folder>/run.mesapack. History and profiles go through the binary cache
+# (so they are parsed at most once), everything else is copied as text. Returns the path of the pack.
+def write_pack(MESA_folder_path):
+    folder = Path(MESA_folder_path)
+    names = sorted(name for name in os.listdir(folder) if PACKED_FILE_PATTERN.fullmatch(name) and (folder/name).is_file())
+
+    pack_path = folder/PACK_FILE_NAME
+    tmp_path = pack_path.with_name(pack_path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    toc = {"version": PACK_FORMAT_VERSION, "source": {}, "files": {}}
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(PACK_MAGIC, 0)) # Offset of the table of contents is filled in at the end
+
+            for name in names:
+                toc["source"][name] = binary_cache.source_signature(folder/name)
+                store = binary_cache.load_store(folder/name) if TABLE_FILE_PATTERN.fullmatch(name) else None
+
+                if store is not None:
+                    f.write(b"\0" * (-f.tell() % BLOCK_ALIGNMENT))
+                    toc["files"][name] = {
+                        "kind": "table",
+                        "offset": f.tell(),
+                        "num_rows": store.num_rows,
+                        "bulk_names": list(store.bulk_names),
+                        "dtypes": [dtype.str for dtype in store.dtypes],
+                        "header_names": store.header_names,
+                        "header_data": store.header_data,
+                    }
+                    f.write(np.ascontiguousarray(store.columns, dtype=np.float64).tobytes())
+                else:
+                    text = (folder/name).read_bytes()
+                    toc["files"][name] = {"kind": "text", "offset": f.tell(), "size": len(text)}
+                    f.write(text)
+
+            toc_offset = f.tell()
+            f.write(json.dumps(toc).encode("utf-8"))
+            f.seek(0)
+            f.write(_HEADER.pack(PACK_MAGIC, toc_offset))
+
+        os.replace(tmp_path, pack_path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    return pack_path
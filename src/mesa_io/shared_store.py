@@ -0,0 +1,264 @@
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # Windows and Pyodide: no locking between processes, so two processes can still parse the same file once each
+
+
+
+
+
+# Host-level store of parsed MESA files, shared by every process on the machine (e.g. the kernel of each session of
+# `marimo run`). Entries have the same layout as the binary cache sidecars (see binary_cache.py) and are memory-mapped
+# read-only, so every process that opens one shares the same pages of the OS page cache instead of holding its own copy.
+# It is where a file's columns go when its sidecar can't be written (e.g. a read-only data folder), and it is where
+# processes take turns parsing: while one process parses a file the others wait on its lock, then attach to the result.
+# Entries are keyed by the source file's path, mtime and size, so an edited file gets a new entry.
+# Reference counting: each process that has an entry mapped holds a lease file on it (<key>.<pid>.lease), released when
+# the last array mapped from it in that process is garbage collected. Leases of processes that have died don't count.
+# Eviction: when the entries add up to more than max_bytes, the least recently attached ones without a live lease are
+# deleted. A process that still has a deleted entry mapped keeps its pages until it lets go of them.
+# The folder is private to the user running the app (one per uid, created with mode 0o700), and is only used if it is
+# a real directory owned by that user that nobody else can write to, so another local user can't plant entries in it.
+# It can be set with the MESA_SHARED_STORE_DIR environment variable.
+_UID = os.getuid() if hasattr(os, "getuid") else None
+SHARED_STORE_DIR = Path(os.environ.get(
+    "MESA_SHARED_STORE_DIR",
+    Path(tempfile.gettempdir())/(f"mesa_shared_store-{_UID}" if _UID is not None else "mesa_shared_store")))
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+
+
+
+@dataclass
+class SharedStoreStats:
+    entries: int
+    leased: int # Entries mapped by at least one live process
+    nbytes: int
+    max_bytes: int
+
+
+
+
+
+class SharedStore:
+
+    def __init__(self, root_dir=SHARED_STORE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root_dir = Path(root_dir)
+        self.max_bytes = max_bytes
+        self._refcounts = {} # key -> number of live mapped arrays in this process
+        self._lock = threading.Lock()
+
+
+
+    @staticmethod
+    def key(source_path, signature):
+        identity = f"{Path(source_path).resolve()}|{signature['mtime_ns']}|{signature['size']}"
+        return hashlib.sha1(identity.encode()).hexdigest()
+
+
+
+    # "<key>.npy" holds the column block and "<key>.json" everything else, like the sidecar files
+    def entry_paths(self, key):
+        return self.root_dir/f"{key}.npy", self.root_dir/f"{key}.json"
+
+
+
+    # Create the folder if needed, and check that it is safe to use: a directory (not a symlink) owned by this user
+    # that no other user can write to. Returns False if it isn't, in which case the store is not used at all
+    def ready(self):
+        try:
+            self.root_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            status = os.lstat(self.root_dir)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(status.st_mode):
+            return False
+        if _UID is not None and (status.st_uid != _UID or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+            return False
+        return True
+
+
+
+    def _lease_path(self, key, pid=None):
+        return self.root_dir/f"{key}.{os.getpid() if pid is None else pid}.lease"
+
+
+
+    # Count owner (an array mapped from entry key) as a user of the entry until it is garbage collected
+    def attach(self, key, owner):
+        with self._lock:
+            count = self._refcounts.get(key, 0)
+            if count == 0:
+                try:
+                    self._lease_path(key).touch()
+                    os.utime(self.entry_paths(key)[1]) # Last attached, for eviction
+                except OSError:
+                    pass
+            self._refcounts[key] = count + 1
+        weakref.finalize(owner, self._release, key)
+
+
+
+    def _release(self, key):
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+                return
+            self._refcounts.pop(key, None)
+            try:
+                self._lease_path(key).unlink()
+            except OSError:
+                pass
+
+
+
+    # Number of live processes that have the entry mapped. Leases left behind by processes that died are removed
+    def refcount(self, key):
+        count = 0
+        for lease_path in self.root_dir.glob(f"{key}.*.lease"):
+            pid = int(lease_path.name.split(".")[1])
+            if _pid_alive(pid):
+                count += 1
+            else:
+                try:
+                    lease_path.unlink()
+                except OSError:
+                    pass
+        return count
+
+
+
+    # Hold the entry's lock, so that only one process at a time parses and publishes a given file.
+    # Yields straight away where there is no cross-process locking, or if the store can't be used (see ready).
+    # evict() deletes lock files (while holding them), so after waiting for the lock, check that the file is still the
+    # one at the lock path; if it was deleted in the meantime, lock the new one instead
+    @contextmanager
+    def locked(self, key):
+        if fcntl is None or not self.ready():
+            yield
+            return
+        lock_path = self.root_dir/f"{key}.lock"
+        while True:
+            try:
+                lock_file = open(lock_path, "a+")
+            except OSError:
+                yield
+                return
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                current = os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino
+            except OSError:
+                current = False
+            if current:
+                break
+            lock_file.close()
+
+        with lock_file:
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+
+    # Delete an entry's lock file, if nobody holds or is waiting on it right now (evict() calls this once the entry is gone)
+    def _remove_lock(self, key):
+        if fcntl is None:
+            return
+        lock_path = self.root_dir/f"{key}.lock"
+        try:
+            lock_file = open(lock_path, "r")
+        except OSError:
+            return
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return # In use: whoever holds it will find the entry gone and parse again
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    lock_path.unlink()
+            except OSError:
+                pass
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+
+    # (key, bytes, last attached) for every entry, least recently attached first
+    def _entries(self):
+        entries = []
+        for npy_path in self.root_dir.glob("*.npy"):
+            key = npy_path.stem
+            try:
+                nbytes = npy_path.stat().st_size
+                last_attached = self.entry_paths(key)[1].stat().st_mtime_ns
+            except OSError:
+                continue
+            entries.append((key, nbytes, last_attached))
+        return sorted(entries, key=lambda entry: entry[2])
+
+
+
+    # Delete entries nobody has mapped, least recently attached first, until the store is back under max_bytes.
+    # Returns the keys that were deleted
+    def evict(self):
+        if not self.ready():
+            return []
+        entries = self._entries()
+        total = sum(nbytes for _, nbytes, _ in entries)
+        evicted = []
+        for key, nbytes, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if self.refcount(key) > 0:
+                continue
+            npy_path, json_path = self.entry_paths(key)
+            try:
+                json_path.unlink() # The .json marks the entry as valid, so it goes first
+                npy_path.unlink()
+            except OSError:
+                continue
+            self._remove_lock(key)
+            total -= nbytes
+            evicted.append(key)
+        return evicted
+
+
+
+    @property
+    def stats(self):
+        entries = self._entries()
+        return SharedStoreStats(
+            entries=len(entries),
+            leased=sum(self.refcount(key) > 0 for key, _, _ in entries),
+            nbytes=sum(nbytes for _, nbytes, _ in entries),
+            max_bytes=self.max_bytes)
+
+
+
+
+
+# On Windows os.kill() terminates the process whatever the signal, so every lease counts as live there
+def _pid_alive(pid):
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True # Exists but belongs to someone else, or can't be checked here
+    return True
@@ -0,0 +1,152 @@
+import numbers
+import threading
+import numpy as np
+
+from . import lazy_data
+
+
+
+
+
+# Profiles at model numbers that MESA didn't save a profile for, made by interpolating in time between the two saved
+# profiles on either side (the "bracketing pair"). The two profiles have different zones, so each one is first put onto
+# a common grid in fractional mass q = m/M: the union of the q values of both profiles, so every zone of either profile
+# is kept. Then every column is a linear blend of the two regridded columns, weighted by age.
+# The regridded columns only depend on the pair, not on the model number, so they are kept on the pair: scrubbing
+# between two saved profiles regrids each column once, and after that building a profile is one blend per column.
+# The result behaves like a loaded profile (columns as attributes, data(), header_data, ...), so the plot functions
+# in src/plot/profile take it as it is.
+
+
+
+
+
+# For each point of grid (ascending), the indices of the points of x (ascending) on either side of it and the weight of the
+# upper one, so that values_on_grid = values[lower]*(1-weight) + values[upper]*weight. Points off either end of x take
+# the value at that end, like np.interp
+def _interp_indices(x, grid):
+    upper = np.clip(np.searchsorted(x, grid), 1, len(x)-1)
+    lower = upper - 1
+    dx = x[upper] - x[lower]
+    weight = np.divide(grid - x[lower], dx, out=np.zeros(len(grid)), where=dx != 0)
+    return lower, upper, np.clip(weight, 0, 1)
+
+
+
+# Stack columns into one 2D array (one row per column), interpolate all of them onto the grid at once
+def _regrid(profile, names, interp):
+    lower, upper, weight = interp
+    stacked = np.stack([np.asarray(profile.data(name), dtype=float)[::-1] for name in names]) # Zones ascending in mass
+    return stacked[:, lower]*(1 - weight) + stacked[:, upper]*weight
+
+
+
+
+
+# Two saved profiles on a common fractional mass grid. Columns are regridded the first time they are asked for, and kept
+class ProfilePair:
+
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+
+        # MESA writes zones from the surface inwards; work with q ascending and flip back at the end
+        q_lower = np.asarray(lower.mass, dtype=float)[::-1] / lower.header_data["star_mass"]
+        q_upper = np.asarray(upper.mass, dtype=float)[::-1] / upper.header_data["star_mass"]
+        self.q = np.union1d(q_lower, q_upper)
+        self._interp_lower = _interp_indices(q_lower, self.q)
+        self._interp_upper = _interp_indices(q_upper, self.q)
+
+        self._columns = {} # name -> (lower regridded, upper regridded), zones ascending in mass
+        self._lock = threading.Lock()
+
+
+
+    @property
+    def bulk_names(self):
+        return tuple(name for name in self.lower.bulk_names if name in self.upper.bulk_names)
+
+
+
+    # Both profiles' values of each column on the common grid, as two 2D arrays (one row per column, surface first)
+    def regridded(self, names):
+        with self._lock:
+            missing = [name for name in dict.fromkeys(names) if name not in self._columns]
+            if missing:
+                for name, lower_row, upper_row in zip(
+                        missing,
+                        _regrid(self.lower, missing, self._interp_lower),
+                        _regrid(self.upper, missing, self._interp_upper)):
+                    self._columns[name] = (lower_row, upper_row)
+            lower = np.stack([self._columns[name][0] for name in names])[:, ::-1]
+            upper = np.stack([self._columns[name][1] for name in names])[:, ::-1]
+        return lower, upper
+
+
+
+    # Bytes of regridded columns held on the pair
+    @property
+    def nbytes(self):
+        return sum(lower.nbytes + upper.nbytes for lower, upper in self._columns.values())
+
+
+
+
+
+# A profile at fraction t (0 = lower, 1 = upper) of the way between the two profiles of a ProfilePair.
+# Columns are blended the first time they are used, like LazyMesaData loads them; load_columns() blends several in one go.
+# The header is the lower profile's, with every numeric entry blended too, except for model_number, star_age and star_mass,
+# which are given (e.g. from the history) so that they match the model the profile stands in for
+class VirtualProfile(lazy_data.LazyMesaData):
+
+    def __init__(self, pair, t, modelnum, star_age, star_mass):
+        self.__dict__.update(_store=None, _columns={}, _bulk_data=None, _fallback=None)
+        self.pair = pair
+        self.t = float(t)
+        self.file_name = f"{pair.lower.file_name} + {pair.upper.file_name} (interpolated to model {modelnum})"
+        self.file_type = "log"
+        self.bulk_names = pair.bulk_names
+
+        self.header_names = list(pair.lower.header_names)
+        self.header_data = {}
+        for name in self.header_names:
+            lower_value = pair.lower.header_data.get(name)
+            upper_value = pair.upper.header_data.get(name)
+            if all(isinstance(value, numbers.Real) and not isinstance(value, bool) for value in [lower_value, upper_value]):
+                self.header_data[name] = lower_value + self.t*(upper_value - lower_value)
+            else:
+                self.header_data[name] = lower_value
+        self.header_data.update(model_number=int(modelnum), star_age=star_age, star_mass=star_mass, num_zones=len(pair.q))
+
+
+
+    # Nothing to read from disk: the pair's profiles are already loaded
+    def load(self):
+        pass
+
+
+
+    # Blend several columns at once (one vectorised pass over all of them)
+    def load_columns(self, names):
+        missing = [name for name in dict.fromkeys(names) if name not in self._columns]
+        if not missing:
+            return
+        lower, upper = self.pair.regridded(missing)
+        blended = lower + self.t*(upper - lower)
+        for name, values in zip(missing, blended):
+            self._columns[name] = values
+
+        # Mass coordinate of the blended grid, rather than a blend of two different mass coordinates
+        if "mass" in self._columns:
+            self._columns["mass"] = self.pair.q[::-1] * self.header_data["star_mass"]
+
+
+
+    def _column(self, name):
+        if self._bulk_data is not None:
+            return self._bulk_data[name]
+        if name not in self._columns:
+            if name not in self.bulk_names:
+                raise KeyError("'" + str(name) + "' is not a valid data type.")
+            self.load_columns([name])
+        return self._columns[name]
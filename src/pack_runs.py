@@ -0,0 +1,22 @@
+from .mesa_io import run_pack
+
+
+
+
+
+# Pack MESA data folders into a single run.mesapack each (see mesa_io/run_pack.py), e.g.
+#     python -m src.pack_runs MESA_data_folders/M=*
+# The loaders pick the pack up automatically; the loose files can then be kept or deleted.
+
+
+
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description=f"Pack the files of MESA data folders into a single {run_pack.PACK_FILE_NAME} each.")
+    parser.add_argument("folders", nargs="+", help="MESA data folders")
+    args = parser.parse_args()
+    for folder in args.folders:
+        pack_path = run_pack.write_pack(folder)
+        print(f"{pack_path}: {len(run_pack.RunPack(pack_path).file_names)} files, {pack_path.stat().st_size/1024:.0f} kB")
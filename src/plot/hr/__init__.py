@@ -1,3 +1,6 @@
 from . import hr 
+from . import label_placement 
 from . import locators 
-from . import spectral_types 
\ No newline at end of file
+from . import lod 
+from . import spectral_types 
+from . import tracks 
\ No newline at end of file
@@ -3,12 +3,15 @@ import matplotlib.ticker as mticker
 import matplotlib.transforms as mtransforms 
 import matplotlib.patches as mpatches 
 import itertools 
-import functools 
+import dataclasses 
 import numpy as np 
 import labellines 
 
+from . import label_placement 
 from . import locators 
+from . import lod 
 from . import spectral_types 
+from . import tracks 
 from ...data import phys_consts 
 
 
@@ -53,7 +56,12 @@ class HRDiagram:
         # Setup events
         self.lines = []
         self._legend = None
+        self._legend_handles = [] # Stand-ins for tracks drawn as part of a shared line (see add_paths)
+        self._track_lods = [] # (line, lod.TrackLOD) for every track, see _update_track_lods 
+        self._color_cycle = itertools.cycle(plt.rcParams["axes.prop_cycle"].by_key()["color"]) # For segments without a color, see add_paths 
         self._connect_pan_events() 
+        self.ax.callbacks.connect('xlim_changed', self._update_track_lods) 
+        self.ax.callbacks.connect('ylim_changed', self._update_track_lods) 
         # self._connect_home_events() 
 
 
@@ -74,6 +82,48 @@ class HRDiagram:
             alpha=alpha
         )
         self.lines.append(line)
+        self._add_track_lod(line, lod.TrackLOD.for_history(history, ind_start, ind_end))
+
+
+
+
+
+    # Add many tracks (or pieces of tracks) at once, as a list of tracks.TrackSegment. 
+    # Segments drawn in the same style share one line (see tracks.build_lines), and outlines are path effects rather than 
+    # a second, wider line underneath, so a diagram with a whole grid of models only has a few artists to redraw when panning. 
+    # Labeled segments get a proxy entry in the legend 
+    def add_paths(self, segments):
+        segments = [
+            segment if segment.color is not None else dataclasses.replace(segment, color=next(self._color_cycle)) 
+            for segment in segments] 
+        lines, lods, legend_handles = tracks.build_lines(segments) 
+        for line, track_lod in zip(lines, lods): 
+            self.ax.add_line(line) 
+            self.lines.append(line) 
+            self._add_track_lod(line, track_lod) 
+        self._legend_handles += legend_handles 
+
+
+
+
+
+    # Tracks are drawn at the coarsest level of detail that looks the same as the full track in the current view (see lod.py), 
+    # so panning and zooming a run with many models only draws the vertices that make a visible difference 
+    def _add_track_lod(self, line, track_lod): 
+        line._lod_level = None 
+        self._track_lods.append((line, track_lod)) 
+        self._set_track_lod_level(line, track_lod, lod.TrackLOD.tolerance_for_view(self.ax)) 
+
+    def _set_track_lod_level(self, line, track_lod, tolerance): 
+        level = track_lod.level_for(tolerance) 
+        if level != line._lod_level: 
+            line.set_data(*track_lod.data(level)) 
+            line._lod_level = level 
+
+    def _update_track_lods(self, ax=None): 
+        tolerance = lod.TrackLOD.tolerance_for_view(self.ax) 
+        for line, track_lod in self._track_lods: 
+            self._set_track_lod_level(line, track_lod, tolerance) 
 
 
 
@@ -89,7 +139,10 @@ class HRDiagram:
 
     def legend(self, **kwargs):
         """Create a legend and optionally connect it to hide during panning."""
-        self._legend = self.ax.legend(**kwargs)
+        handles, labels = self.ax.get_legend_handles_labels() 
+        handles += self._legend_handles 
+        labels += [handle.get_label() for handle in self._legend_handles] 
+        self._legend = self.ax.legend(handles, labels, **kwargs)
 
 
 
@@ -199,8 +252,7 @@ class HRDiagram:
                 self.ax.yaxis.set_major_locator(mticker.NullLocator()) 
                 self.ax.yaxis.set_minor_locator(mticker.NullLocator()) 
             
-            # Hide spectral labels and spans
-            self._set_spectral_label_visibility(False) 
+            # Hide spectral spans (spectral labels follow the view, see add_spectral_type_labels)
             if self.hide_spectraltype_spans: 
                 self._set_spectral_spans_visibility(False)
             
@@ -233,7 +285,8 @@ class HRDiagram:
                 self.setup_ticks() 
 
             # Restore visibility and recalculate labels
-            self._draw_spectral_labels()  
+            if hasattr(self, "_draw_spectral_labels"): 
+                self._draw_spectral_labels()  
             if self.hide_spectraltype_spans: 
                 self._set_spectral_spans_visibility(True)
                 
@@ -251,13 +304,14 @@ class HRDiagram:
     def add_spectral_type_labels(self, min_spacing_pixels=120, hide_spectraltype_spans=True):
         """
         Add spectral type labels (OBAFGKM sequence) and shaded spectral bands.
-        Labels automatically hide during pan/zoom and reappear afterward.
+        Labels are resampled whenever the x limits change, so they stay visible and follow the view during pan/zoom.
         """
 
         # Store settings and initialize storage
         self.hide_spectraltype_spans = hide_spectraltype_spans
         self._min_spacing_pixels = min_spacing_pixels
-        self._spectral_label_elements = []   # list of (text, line) pairs
+        self._spectral_label_elements = []   # list of (text, line) pairs currently shown
+        self._spectral_label_pool = []   # every (text, line) pair created so far; the ones not shown are hidden
         self._spectral_spans = []
         self._spectral_color_cycle = itertools.cycle(["black", "white"])
 
@@ -266,54 +320,70 @@ class HRDiagram:
 
 
         # --- Helper: Determine which subtypes fit in current view ---
+        # Subtypes are sorted hottest first (spectral_types.LABELED_SUBTYPE_TEMPS), so the ones in view are a contiguous run
+        # found by bisection, and their screen positions are monotonic. Going from hottest to coolest, each label is the first
+        # subtype at least min_spacing_pixels from the previous label, which is another bisection
         def _sample_visible_subtypes():
             xmax, xmin = self.ax.get_xlim()
-            selected = []
-            spectral_letters = "OBAFGKM"
-
-            for stype in spectral_types.SPECTRAL_TYPES:
-                if stype.letter not in spectral_letters:
-                    continue 
-                for subtype in stype.subtypes: 
-                    if xmin <= subtype.temp <= xmax:
-                        x_disp = self.ax.transData.transform((subtype.temp, 0))[0] 
-                        if not selected or abs(x_disp - selected[-1][1]) >= min_spacing_pixels:
-                            selected.append((subtype, x_disp))
-            return [subtype for subtype, _ in selected]
-
-
-
-        # --- Helper: Draw or refresh labels ---
-        def _draw_labels():
-            # Remove old labels
-            for txt, line in getattr(self, "_spectral_label_elements", []):
-                txt.remove()
-                line.remove()
-            self._spectral_label_elements = []
-
+            temps = spectral_types.LABELED_SUBTYPE_TEMPS
+            ind_start = np.searchsorted(-temps, -xmax, side='left')
+            ind_end = np.searchsorted(-temps, -xmin, side='right')
+            if ind_start >= ind_end: 
+                return []
+
+            x_disp = self.ax.transData.transform(np.column_stack([temps[ind_start:ind_end], np.zeros(ind_end-ind_start)]))[:, 0]
+            distance = np.abs(x_disp - x_disp[0]) # Screen distance from the hottest subtype in view, increasing
+            selected = [0]
+            while True:
+                i = np.searchsorted(distance, distance[selected[-1]] + min_spacing_pixels, side='left')
+                if i >= len(distance): 
+                    break
+                selected.append(i)
+            return [spectral_types.LABELED_SUBTYPES[ind_start + i] for i in selected]
+
+
+
+        # --- Helper: Place labels for the current view, reusing the text and connector artists already made ---
+        def _update_labels(ax=None):
             subtypes_to_display = _sample_visible_subtypes()
             transform = self.ax.get_xaxis_transform(which='grid')
 
-            for subtype in subtypes_to_display:
-                x = subtype.temp
+            # More labels than ever before: make the missing artists
+            while len(self._spectral_label_pool) < len(subtypes_to_display):
 
                 # Connector line (like a tick)
                 connector = self.ax.plot(
-                    [x, x], [1.0, 1.015],
+                    [np.nan, np.nan], [1.0, 1.015],
                     transform=transform, color='black', lw=1.0, clip_on=False
                 )[0]
 
                 # Text label
                 txt = self.ax.text(
-                    x, 1.02,
-                    f"{subtype.label.replace('V', '')} \n({int(subtype.temp):,} K)",
+                    np.nan, 1.02, "",
                     transform=transform,
                     ha='center', va='bottom',
                     fontsize=10, color='black'
                 )
 
-                self._spectral_label_elements.append((txt, connector))
+                self._spectral_label_pool.append((txt, connector))
+
+            for (txt, connector), subtype in zip(self._spectral_label_pool, subtypes_to_display):
+                x = subtype.temp
+                connector.set_xdata([x, x])
+                txt.set_x(x)
+                txt.set_text(f"{subtype.label.replace('V', '')} \n({int(subtype.temp):,} K)")
+                txt.set_visible(True)
+                connector.set_visible(True)
+            for txt, connector in self._spectral_label_pool[len(subtypes_to_display):]:
+                txt.set_visible(False)
+                connector.set_visible(False)
+            self._spectral_label_elements = self._spectral_label_pool[:len(subtypes_to_display)]
+
+
 
+        # --- Helper: Draw or refresh labels ---
+        def _draw_labels():
+            _update_labels()
             self.fig.canvas.draw_idle()
 
 
@@ -365,6 +435,9 @@ class HRDiagram:
         self._draw_spectral_labels = _draw_labels
         self._sample_visible_subtypes = _sample_visible_subtypes
 
+        # Follow the view (the pan/zoom redraws the figure itself)
+        self.ax.callbacks.connect('xlim_changed', _update_labels)
+
         # Initial draw
         _draw_labels()
 
@@ -372,18 +445,6 @@ class HRDiagram:
 
 
 
-    def _set_spectral_label_visibility(self, visible):
-        """Show or hide both text and connector lines."""
-        if not hasattr(self, "_spectral_label_elements"):
-            return
-        for txt, connector in self._spectral_label_elements:
-            txt.set_visible(visible)
-            connector.set_visible(visible)
-
-
-
-
-
     def _set_spectral_spans_visibility(self, visible):
         """Show or hide the background spectral spans."""
         if not hasattr(self, "_spectral_spans"):
@@ -422,28 +483,9 @@ class HRDiagram:
         ax = self.ax
 
 
-        # Check if too points are too close (the labels will overlap)
-        def calc_is_too_close(point1, point2, current_bounds): 
-
-            min_x_fractional_sep = 0.08  
-            min_y_fractional_sep = 0.08  
-
-            xlim, ylim = current_bounds 
-
-            x_sep = np.abs(point1[0]-point2[0]) 
-            y_sep = np.abs(point1[1]-point2[1]) 
-            
-            log_xlim = np.log10(xlim) 
-            log_ylim = np.log(ylim)
-
-            log_xrange = max(log_xlim) - min(log_xlim) 
-            log_yrange = max(log_ylim) - min(log_ylim) 
-
-            # Check whether the two points are too close 
-            if x_sep < min_x_fractional_sep*log_xrange and y_sep < min_y_fractional_sep*log_yrange:
-                return True
-            else: 
-                return False  
+        # Labels closer together than this fraction of the axes range (in both x and y) would overlap 
+        min_x_fractional_sep = 0.08  
+        min_y_fractional_sep = 0.08  
 
 
 
@@ -472,19 +514,15 @@ class HRDiagram:
             xlim = ax.get_xlim() 
             ylim = ax.get_ylim() 
 
-            # Return x,y coords of points within axes bounds 
-            ind_models_available = history.model_numbers_available-1 
-            log_Teff = history.log_Teff[ind_models_available]
-            log_L = history.log_L[ind_models_available]
-            ind_in_view = functools.reduce(
-                np.intersect1d, 
-                [
-                    np.where(10**log_Teff>min(xlim)), 
-                    np.where(10**log_Teff<max(xlim)), 
-                    np.where(10**log_L>min(ylim)), 
-                    np.where(10**log_L<max(ylim)) ] )
-            log_Teff_in_view = log_Teff[ind_in_view]
-            log_L_in_view = log_L[ind_in_view]
+            # Return x,y coords (and model numbers) of points within axes bounds. The points of the saved models are only 
+            # gathered out of the history once (see label_placement.model_points), so this doesn't depend on the history's length 
+            points = label_placement.model_points(history) 
+            in_view = (
+                (points["log_Teff"] > np.log10(min(xlim))) & (points["log_Teff"] < np.log10(max(xlim))) & 
+                (points["log_L"] > np.log10(min(ylim))) & (points["log_L"] < np.log10(max(ylim))) ) 
+            points_in_view = points[in_view] 
+            log_Teff_in_view = points_in_view["log_Teff"]
+            log_L_in_view = points_in_view["log_L"]
 
             if len(log_Teff_in_view) == 0:
                 ax._model_points = ax.scatter([], []) 
@@ -498,10 +536,8 @@ class HRDiagram:
 
             # 3) Calculate positions to place labels (subset of points with model numbers, so that labels don't overlap)
 
-            log_Teff_labeled = [log_Teff_in_view[0]]
-            log_L_labeled = [log_L_in_view[0]]
-
-            # try to use modelnum_now if it’s valid and in range
+            # The current model gets its own label (see below), if it's in view, so the others have to keep clear of it 
+            fixed = [] 
             if modelnum_now is not None:
                 x = history.log_Teff[modelnum_now - 1]
                 y = history.log_L[modelnum_now - 1] 
@@ -510,40 +546,21 @@ class HRDiagram:
                 in_y_range = np.log10(min(ylim)) < y < np.log10(max(ylim))
 
                 if in_x_range and in_y_range:
-                    log_Teff_labeled = [x]
-                    log_L_labeled = [y] 
-
-            # Loop over all available points 
-            for i in np.arange(1, len(log_Teff_in_view)): 
-
-                x = log_Teff_in_view[i] 
-                y = log_L_in_view[i] 
-
-                # Check if the current point should be labeled or not 
-                # Only label if this point isn't too close to any of the other labels 
-                is_too_close = False 
-                for j in range(len(log_Teff_labeled)): 
-                    x0 = log_Teff_labeled[j]
-                    y0 = log_L_labeled[j] 
-                    if calc_is_too_close((x,y), ((x0,y0)), (xlim,ylim)): 
-                        is_too_close = True 
-                        break 
-                if is_too_close: 
-                    continue 
-            
-                # If we haven't skipped to the next point, the current point is not too close to any of the current labels, so add it to the list 
-                log_Teff_labeled.append(x)
-                log_L_labeled.append(y) 
+                    fixed = [(x, y)] 
 
-            # Convert lists back to numpy array 
-            log_Teff_labeled = np.array(log_Teff_labeled) 
-            log_L_labeled = np.array(log_L_labeled) 
+            # Minimum separations, as fractions of the log range of each axis 
+            log_xlim = np.log10(xlim) 
+            log_ylim = np.log(ylim)
+            ind_labeled = label_placement.place_labels(
+                log_Teff_in_view, 
+                log_L_in_view, 
+                min_dx = min_x_fractional_sep*(max(log_xlim) - min(log_xlim)), 
+                min_dy = min_y_fractional_sep*(max(log_ylim) - min(log_ylim)), 
+                fixed = fixed) 
+            log_Teff_labeled = log_Teff_in_view[ind_labeled] 
+            log_L_labeled = log_L_in_view[ind_labeled] 
+            modelnums_labeled = points_in_view["modelnum"][ind_labeled] 
 
-            # Remove current model number from labels list and apply a separate label to it 
-            if modelnum_now is not None: 
-                log_Teff_labeled = log_Teff_labeled[log_Teff_labeled != history.log_Teff[modelnum_now-1]] 
-                log_L_labeled = log_L_labeled[log_L_labeled != history.log_L[modelnum_now-1]] 
-            
 
 
             # 4) Add labels and points calculated in previous sections to the plot 
@@ -564,7 +581,7 @@ class HRDiagram:
                 ax._model_labels.append( ax.text(
                     10**log_Teff_labeled[i], 
                     10**log_L_labeled[i], 
-                    np.where(history.log_Teff == log_Teff_labeled[i])[0][0]+1,  
+                    modelnums_labeled[i],  
                     fontsize=10, ha='left', va='bottom', zorder=20, clip_on=True, 
                     bbox=dict(facecolor='white', edgecolor='black', alpha=1.0, boxstyle='round,pad=0.2')) )
 
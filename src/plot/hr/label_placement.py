@@ -0,0 +1,73 @@
+import weakref
+import numpy as np
+
+
+
+
+
+# The points of a history that can be labeled (its saved models), as a structured array with fields log_Teff, log_L and modelnum,
+# in order of model number. Built the first time it is asked for and kept for as long as the history is alive, so redrawing
+# the labels never has to gather them out of the full history again, or search the history for a label's model number.
+# Rebuilt if the history's list of saved models is replaced (e.g. a live run that has saved more profiles)
+MODEL_POINTS_DTYPE = np.dtype([("log_Teff", np.float64), ("log_L", np.float64), ("modelnum", np.int64)])
+_model_points = weakref.WeakKeyDictionary() # history -> (model_numbers_available it was built from, points)
+
+def model_points(history):
+    model_numbers = history.model_numbers_available
+    cached = _model_points.get(history)
+    if cached is not None and cached[0] is model_numbers:
+        return cached[1]
+
+    model_numbers = np.asarray(model_numbers, dtype=np.int64)
+    points = np.empty(len(model_numbers), dtype=MODEL_POINTS_DTYPE)
+    points["log_Teff"] = np.asarray(history.log_Teff)[model_numbers-1]
+    points["log_L"] = np.asarray(history.log_L)[model_numbers-1]
+    points["modelnum"] = model_numbers
+    _model_points[history] = (history.model_numbers_available, points)
+    return points
+
+
+
+
+
+# Greedy label placement: go through the points in order and label each one that isn't too close to a point already labeled.
+# Two points are too close if they are within min_dx of each other in x AND within min_dy in y (their labels would overlap).
+# Labeled points are kept in a grid of min_dx by min_dy cells. Any two points in the same cell are too close, so a cell holds
+# at most one labeled point, and a point that is too close to a labeled one always has it in its own cell or one of the 8
+# around it: each point costs at most 9 lookups (usually 1, since most points fall in a cell that is already taken),
+# which keeps the whole pass linear in the number of points.
+# fixed: (x, y) of points that are labeled separately (e.g. the selected model), which the other labels have to keep clear of.
+# Returns the indices of the labeled points, in order.
+def place_labels(x, y, min_dx, min_dy, fixed=()):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    fixed = np.asarray(fixed, dtype=float).reshape(-1, 2)
+
+    # Fixed points go first, then the candidates
+    all_x = np.concatenate([fixed[:, 0], x])
+    all_y = np.concatenate([fixed[:, 1], y])
+    cells = list(zip(
+        np.floor(all_x / min_dx).astype(np.int64).tolist(),
+        np.floor(all_y / min_dy).astype(np.int64).tolist()))
+    all_x = all_x.tolist()
+    all_y = all_y.tolist()
+
+    grid = {} # (cell x, cell y) -> indices (into all_x/all_y) of the labeled points in that cell (only fixed points can share one)
+    for i in range(len(fixed)):
+        grid.setdefault(cells[i], []).append(i)
+
+    labeled = []
+    neighbors = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    for i in range(len(fixed), len(all_x)):
+        cell = cells[i]
+        if cell in grid:
+            continue
+        xi, yi = all_x[i], all_y[i]
+        cx, cy = cell
+        if not any(
+                abs(xi - all_x[j]) < min_dx and abs(yi - all_y[j]) < min_dy
+                for dx, dy in neighbors if (cx+dx, cy+dy) in grid for j in grid[(cx+dx, cy+dy)]):
+            grid[cell] = [i]
+            labeled.append(i - len(fixed))
+
+    return np.array(labeled, dtype=int)
@@ -0,0 +1,160 @@
+import weakref
+import numpy as np
+
+
+
+
+
+# Level of detail for evolutionary tracks. A run can have hundreds of thousands of models, but at any zoom most of them
+# land within a fraction of a pixel of the line through their neighbours, and drawing them changes nothing.
+# Each track is simplified with Ramer-Douglas-Peucker in (log_Teff, log_L) space, which is what the log axes draw linearly.
+# RDP is run once per history, recording for every model the tolerance at which it would be dropped (its "importance");
+# the simplified track for any tolerance is then just the models whose importance is above it. Levels are kept at
+# tolerances a factor LEVEL_RATIO apart, and on every view change each track switches to the coarsest level that stays within
+# PIXEL_TOLERANCE pixels of the full track, so the number of vertices drawn depends on how much detail is visible rather than
+# on how many models the run has.
+# PIXEL_TOLERANCE is well below matplotlib's own path simplification threshold (1/9 pixel): the line lands on the same pixels, and
+# only their antialiasing can change, by less than matplotlib's simplification already changes it.
+PIXEL_TOLERANCE = 0.02
+LEVEL_RATIO = 2
+MIN_VERTICES = 256 # Tracks shorter than this are always drawn in full
+
+
+
+
+
+# For each point of a polyline, the RDP tolerance below which it is kept (inf for the endpoints).
+# Monotonic down the RDP recursion: a point never outlives the point that split its parent span, so
+# thresholding at any tolerance gives exactly the RDP simplification at that tolerance.
+# The recursion is run breadth first, splitting every open span at once, so each pass over the points is a few numpy calls
+# and the number of passes is the depth of the recursion rather than the number of points
+def rdp_importance(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    importance = np.zeros(n)
+    if n == 0:
+        return importance
+    importance[0] = importance[-1] = np.inf
+
+    bounds = np.array([0, n-1]) # Points split at so far, in order; span s runs from bounds[s] to bounds[s+1]
+    parents = np.array([np.inf]) # Importance of the point that made each span
+    inside = np.arange(1, n-1) # Points not split at yet
+    while len(inside) > 0:
+        span = np.searchsorted(bounds, inside) - 1
+        i, j = bounds[span], bounds[span+1]
+
+        # Distance of every point to the segment from point i to point j of its span (to point i, if they coincide)
+        dx, dy = x[j] - x[i], y[j] - y[i]
+        px, py = x[inside] - x[i], y[inside] - y[i]
+        length_squared = dx*dx + dy*dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(length_squared > 0, np.clip((px*dx + py*dy) / length_squared, 0, 1), 0)
+        distance = np.hypot(px - t*dx, py - t*dy)
+
+        # Farthest point of each span (the first one, on a tie). Points are in order, so each span's points are contiguous
+        span_start = np.diff(span, prepend=-1) != 0
+        starts = np.flatnonzero(span_start)
+        group = np.cumsum(span_start) - 1
+        farthest = np.flatnonzero(distance == np.maximum.reduceat(distance, starts)[group])
+        split = farthest[np.unique(group[farthest], return_index=True)[1]]
+        split_span = span[split]
+        d = np.minimum(distance[split], parents[split_span])
+        importance[inside[split]] = d
+
+        # Each split span becomes two, both made by the split point
+        bounds = np.insert(bounds, split_span+1, inside[split])
+        parents = np.insert(parents, split_span+1, d)
+        parents[np.searchsorted(bounds, inside[split]) - 1] = d
+        inside = np.delete(inside, split)
+
+    return importance
+
+
+
+# Importance of every model of a history, computed the first time it is asked for and kept while the history is alive
+_history_importance = weakref.WeakKeyDictionary()
+
+def history_importance(history):
+    importance = _history_importance.get(history)
+    if importance is None:
+        importance = rdp_importance(np.asarray(history.log_Teff, dtype=float), np.asarray(history.log_L, dtype=float))
+        _history_importance[history] = importance
+    return importance
+
+
+
+
+
+# A track (log_x, log_y with the importance of each vertex) at several levels of detail.
+# levels[k] holds the indices of the vertices kept at tolerance tolerances[k]; level 0 is the full track
+class TrackLOD:
+
+    def __init__(self, log_x, log_y, importance):
+        self.log_x = np.asarray(log_x, dtype=float)
+        self.log_y = np.asarray(log_y, dtype=float)
+        self.importance = np.asarray(importance, dtype=float)
+
+        self.tolerances = [0.0]
+        self.levels = [np.arange(len(self.log_x))]
+        finite = self.importance[np.isfinite(self.importance) & (self.importance > 0)]
+        if len(self.log_x) >= MIN_VERTICES and len(finite) > 0:
+            tolerance = max(np.min(finite), np.max(finite) / LEVEL_RATIO**20)
+            while tolerance < np.max(finite):
+                kept = np.flatnonzero(self.importance > tolerance)
+                if len(kept) < len(self.levels[-1]):
+                    self.tolerances.append(tolerance)
+                    self.levels.append(kept)
+                if len(kept) < MIN_VERTICES:
+                    break
+                tolerance *= LEVEL_RATIO
+        self._data = {} # level -> (x, y) in data coordinates
+
+
+
+    # Index of the coarsest level with a tolerance of at most tolerance
+    def level_for(self, tolerance):
+        return int(np.searchsorted(self.tolerances, tolerance, side="right")) - 1
+
+
+
+    # (x, y) in data coordinates (10**log) of one level
+    def data(self, level):
+        if level not in self._data:
+            indices = self.levels[level]
+            self._data[level] = 10**self.log_x[indices], 10**self.log_y[indices]
+        return self._data[level]
+
+
+
+    # Tolerance (in log units) equivalent to PIXEL_TOLERANCE pixels in the current view of ax (log x and y axes)
+    @staticmethod
+    def tolerance_for_view(ax, pixel_tolerance=None):
+        pixel_tolerance = PIXEL_TOLERANCE if pixel_tolerance is None else pixel_tolerance
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        pixels_per_decade_x = ax.bbox.width / abs(np.log10(xlim[1]) - np.log10(xlim[0]))
+        pixels_per_decade_y = ax.bbox.height / abs(np.log10(ylim[1]) - np.log10(ylim[0]))
+        return pixel_tolerance / max(pixels_per_decade_x, pixels_per_decade_y)
+
+
+
+    # Track for the slice [ind_start:ind_end] of a history, using the history's cached importance.
+    # The slice's ends are always kept. Since the importance was worked out on the whole track, a simplification of the slice
+    # can stray up to twice the tolerance from it; the tolerances are halved to make up for that
+    @classmethod
+    def for_history(cls, history, ind_start, ind_end):
+        importance = history_importance(history)[ind_start:ind_end].copy()
+        if len(importance) > 0:
+            importance[0] = importance[-1] = np.inf
+        return cls(history.log_Teff[ind_start:ind_end], history.log_L[ind_start:ind_end], importance/2)
+
+
+
+    # Several tracks joined into one, separated by NaN gaps (as drawn by a single Line2D, see tracks.build_lines)
+    @classmethod
+    def concatenate(cls, lods):
+        gap = np.array([np.nan])
+        log_x = np.concatenate([array for lod in lods for array in [lod.log_x, gap]])
+        log_y = np.concatenate([array for lod in lods for array in [lod.log_y, gap]])
+        importance = np.concatenate([array for lod in lods for array in [lod.importance, np.array([np.inf])]]) # Gaps are always kept
+        return cls(log_x, log_y, importance)
@@ -140,3 +140,15 @@ SPECTRAL_TYPES: List[SpectralType] = [
     SpectralType(letter="K", temp_range=(3_890, 5_330),            MS_mass_range=(0.58, 0.89), subtypes=_K, color="#F9DAB7"),
     SpectralType(letter="M", temp_range=(2_310, 3_890),            MS_mass_range=(0.1, 0.58),  subtypes=_M, color="#F4B673"),
 ]
+
+
+
+
+
+# Subtypes that get a label on the HR diagram (see HRDiagram.add_spectral_type_labels), hottest first, with their temperatures
+# as an array so the ones in view can be found by bisection
+LABELED_LETTERS = "OBAFGKM"
+LABELED_SUBTYPES: List[SpectralSubtype] = sorted(
+    [subtype for stype in SPECTRAL_TYPES if stype.letter in LABELED_LETTERS for subtype in stype.subtypes],
+    key=lambda subtype: -subtype.temp)
+LABELED_SUBTYPE_TEMPS = np.array([subtype.temp for subtype in LABELED_SUBTYPES], dtype=float)
@@ -0,0 +1,104 @@
+import numpy as np
+import matplotlib.colors as mcolors
+import matplotlib.patheffects as mpatheffects
+from dataclasses import dataclass
+from matplotlib.lines import Line2D
+
+from . import lod
+
+
+
+
+
+# One piece of an evolutionary track for HRDiagram.add_paths: models modelnum_start to modelnum_end of a history
+# (from the start/to the end of the run if None), and how to draw it.
+# outline: color of a border drawn around the line, outline_lw wide (e.g. to highlight the selected stage), or None
+@dataclass
+class TrackSegment:
+    history: object
+    modelnum_start: int = None
+    modelnum_end: int = None
+    color: str = None
+    lw: float = 2
+    alpha: float = 1
+    label: str = None
+    outline: str = None
+    outline_lw: float = 3
+
+
+
+
+
+# Rows of the history a segment covers, as (ind_start, ind_end). Same slicing as HRDiagram.add_path
+def _segment_slice(segment):
+    ind_start = 0 if segment.modelnum_start is None else segment.modelnum_start - 1
+    ind_end = -1 if segment.modelnum_end is None else segment.modelnum_end - 1 + 1 # Add one to ending to remove gaps between segments
+    return ind_start, ind_end
+
+
+
+# (x, y) vertices of a segment, in data coordinates
+def segment_vertices(segment):
+    ind_start, ind_end = _segment_slice(segment)
+    return 10**segment.history.log_Teff[ind_start:ind_end], 10**segment.history.log_L[ind_start:ind_end]
+
+
+
+# Level of detail of a segment (see lod.py)
+def segment_lod(segment):
+    return lod.TrackLOD.for_history(segment.history, *_segment_slice(segment))
+
+
+
+# Path effects that draw the outline underneath the line itself
+def outline_effects(outline, outline_lw):
+    return [mpatheffects.Stroke(linewidth=outline_lw, foreground=outline), mpatheffects.Normal()]
+
+
+
+
+
+# Batch segments into as few artists as possible: one Line2D per style (color, width, alpha, outline), holding all the
+# segments drawn in that style one after another, separated by NaNs (which break the line). A Line2D rather than a
+# LineCollection, because Agg only simplifies the paths of lines (dropping vertices that don't move the line by a visible
+# amount), so a LineCollection of long tracks takes longer to draw than the separate lines it replaces.
+# Lines come out in the order their first segment appears. Segments must already have a color.
+# Returns the lines, the level of detail of each line (see lod.py), and a proxy Line2D (holding no data) for each labeled
+# segment, in order, to put in the legend
+def build_lines(segments, zorder=2):
+    groups = {}
+    for segment in segments:
+        style = (
+            mcolors.to_rgba(segment.color), segment.lw, segment.alpha,
+            segment.outline, segment.outline_lw if segment.outline is not None else None)
+        groups.setdefault(style, []).append(segment)
+
+    lines = []
+    lods = []
+    for (color, lw, alpha, outline, outline_lw), group in groups.items():
+        x, y = [], []
+        for segment in group:
+            segment_x, segment_y = segment_vertices(segment)
+            x += [segment_x, [np.nan]]
+            y += [segment_y, [np.nan]]
+        lods.append(lod.TrackLOD.concatenate([segment_lod(segment) for segment in group]))
+        lines.append(Line2D(
+            np.concatenate(x),
+            np.concatenate(y),
+            color=color,
+            lw=lw,
+            alpha=alpha,
+            zorder=zorder,
+            path_effects=outline_effects(outline, outline_lw) if outline is not None else None))
+
+    legend_handles = [
+        Line2D(
+            [], [],
+            color=segment.color,
+            lw=segment.lw,
+            alpha=segment.alpha,
+            label=segment.label,
+            path_effects=outline_effects(segment.outline, segment.outline_lw) if segment.outline is not None else None)
+        for segment in segments if segment.label is not None ]
+
+    return lines, lods, legend_handles
@@ -0,0 +1,73 @@
+import sys
+import numpy as np
+from pathlib import Path
+
+from .data.stars import MESA_models
+from .data.stars import stage_detection
+from . import load_data
+
+
+
+
+
+# Compares the automatically detected stage boundaries (data/stars/stage_detection.py) with the hand-tuned ones in
+# catalogue.json, for every catalogued run that has a history file:
+#     python -m src.validate_stages
+# For each stage it prints the hand-tuned and detected start/end model numbers, and how far apart they are as a
+# fraction of the stage's length in log(age), which is how far apart they look on the history plot.
+
+
+
+
+
+# (substage mode1_abbrev, hand-tuned start, detected start, hand-tuned end, detected end, error) for one run.
+# error is the largest start/end offset as a fraction of the stage's log(age) span, or None if only one side has the stage
+def compare_run(MESA_folder_path, models=None):
+    if models is None:
+        models = MESA_models.ALL_MODELS_LIST
+    history = load_data.load_history(MESA_folder_path)
+    hand_tuned = {model.substage.id: model for model in models if Path(model.MESA_folder_path) == Path(MESA_folder_path) and model.model_start is not None}
+    detected = {model.substage.id: model for model in stage_detection.detect_models(MESA_folder_path) if model.model_start is not None}
+
+    rows = []
+    substage_ids = list(hand_tuned) + [substage_id for substage_id in detected if substage_id not in hand_tuned]
+    for substage_id in substage_ids:
+        hand, auto = hand_tuned.get(substage_id), detected.get(substage_id)
+        error = None
+        if hand is not None and auto is not None:
+            log_age = lambda modelnum: np.log10(max(history.star_age[modelnum-1], 1e-10))
+            span = log_age(hand.model_end) - log_age(hand.model_start)
+            if span > 0:
+                error = max(abs(log_age(auto.model_start) - log_age(hand.model_start)), abs(log_age(auto.model_end) - log_age(hand.model_end))) / span
+        abbrev = (hand or auto).substage.mode1_abbrev
+        rows.append((abbrev,
+            hand.model_start if hand else None, auto.model_start if auto else None,
+            hand.model_end if hand else None, auto.model_end if auto else None,
+            error))
+    return rows
+
+
+
+
+
+def print_report(file=sys.stdout):
+    folders = list(dict.fromkeys(model.MESA_folder_path for model in MESA_models.ALL_MODELS_LIST))
+    for MESA_folder_path in folders:
+        try:
+            rows = compare_run(MESA_folder_path)
+        except Exception as e:
+            print(f"{MESA_folder_path}: skipped ({type(e).__name__}: {e})\n", file=file)
+            continue
+        print(f"{MESA_folder_path}:", file=file)
+        print(f"    {'stage':<12}{'start (hand)':>14}{'start (auto)':>14}{'end (hand)':>12}{'end (auto)':>12}{'error':>9}", file=file)
+        for abbrev, hand_start, auto_start, hand_end, auto_end, error in rows:
+            error = "missing" if error is None else f"{error:.1%}"
+            print(f"    {abbrev:<12}{str(hand_start):>14}{str(auto_start):>14}{str(hand_end):>12}{str(auto_end):>12}{error:>9}", file=file)
+        print(file=file)
+
+
+
+
+
+if __name__ == "__main__":
+    print_report()
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from . import load_data
+from .data.stars import MESA_models
+from .mesa_io import binary_cache
+from .mesa_io import mesa_folder
+from .mesa_io import prefetch
+
+
+
+
+
+# Loads every history and example profile used by the catalogued models (MESA_models.ALL_MODELS_LIST) ahead of time,
+# so the first clicks in the flowchart / stage-first mode don't each wait on a parse.
+# From the command line it only fills the binary caches on disk, since the app's in-memory caches (load_history, PROFILE_CACHE)
+# belong to the server process:
+#     python -m src.warmup [--processes] [--workers N]
+# To have the server itself hot, set MESA_WARMUP=1 when starting it (e.g. MESA_WARMUP=1 marimo run main.py):
+# the app's setup cell then calls warm_up_from_env(), which warms up that process once, before the first session goes on.
+WARMUP_ENV_VAR = "MESA_WARMUP"
+
+
+
+
+
+@dataclass
+class WarmupResult:
+    kind: str # "history" or "profile"
+    MESA_folder_path: str
+    modelnum: int # None for histories
+    seconds: float
+    error: str # None if the file loaded fine
+    stage: str = "load" # "load": opened through the app's loaders in this process; "build": binary cache built by a worker process
+
+
+
+
+
+# (kind, folder, modelnum) for every distinct file the catalogue uses
+def catalogue_files(models=None):
+    if models is None:
+        models = MESA_models.ALL_MODELS_LIST
+    files = []
+    for model in models:
+        files.append(("history", model.MESA_folder_path, None))
+    for model in models:
+        if model.model_example is not None:
+            files.append(("profile", model.MESA_folder_path, model.model_example))
+    return list(dict.fromkeys(files)) # Remove duplicates, keeping order
+
+
+
+
+
+# Load one file in this process, through the same cached loaders the app uses
+def _warm_file(kind, MESA_folder_path, modelnum):
+    start = time.perf_counter()
+    try:
+        if kind == "history":
+            load_data.load_history(MESA_folder_path).load()
+        else:
+            load_data.load_profile(MESA_folder_path, modelnum).load()
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return WarmupResult(kind, str(MESA_folder_path), modelnum, time.perf_counter() - start, error, "load")
+
+
+
+# Worker processes can't fill this process's caches, so they only build the binary cache on disk (the slow part).
+# The files are then opened in this process afterwards, which is fast
+def _build_binary_cache(kind, MESA_folder_path, modelnum):
+    start = time.perf_counter()
+    try:
+        folder = mesa_folder.get_folder(MESA_folder_path)
+        if folder.pack is None: # A packed run (see mesa_io/run_pack.py) has nothing to build
+            path = folder.history_path if kind == "history" else folder.profile_path(modelnum)
+            binary_cache.load_store(path)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return WarmupResult(kind, str(MESA_folder_path), modelnum, time.perf_counter() - start, error, "build")
+
+
+
+
+
+# Load all catalogue files concurrently. Returns one WarmupResult per file, in catalogue order.
+# use_processes: parse on a process pool instead of a thread pool (parsing holds the GIL, so this is faster with many cold files).
+# The files are then opened in this process as well, so the results are the "build" pass followed by the "load" pass.
+# Without threads (Pyodide) the files are loaded one after another
+def warm_up(models=None, max_workers=None, use_processes=False):
+    files = catalogue_files(models)
+
+    build_results = []
+    if use_processes:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_build_binary_cache, *file): i for i, file in enumerate(files)}
+            build_results = [None] * len(files)
+            for future in as_completed(futures):
+                build_results[futures[future]] = future.result()
+        return build_results + [_warm_file(*file) for file in files]
+
+    if not prefetch.THREADS_AVAILABLE:
+        return [_warm_file(*file) for file in files]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda file: _warm_file(*file), files))
+
+
+
+# Warm up this process if WARMUP_ENV_VAR is set, the first time it is called (later calls, e.g. from other sessions of
+# the same server, do nothing). Returns the results, or None if nothing was done
+_warmed_up = False
+_warm_up_lock = threading.Lock()
+
+def warm_up_from_env(file=sys.stdout):
+    global _warmed_up
+    if not os.environ.get(WARMUP_ENV_VAR):
+        return None
+    with _warm_up_lock:
+        if _warmed_up:
+            return None
+        results = warm_up()
+        _warmed_up = True
+    print_report(results, file=file)
+    return results
+
+
+
+
+
+def print_report(results, file=sys.stdout):
+    for result in results:
+        name = "history" if result.kind == "history" else f"profile (model {result.modelnum})"
+        status = "ok" if result.error is None else f"FAILED: {result.error}"
+        print(f"{result.stage:>5} {result.seconds*1000:9.1f} ms   {result.MESA_folder_path}  {name}  {status}", file=file)
+    for stage in dict.fromkeys(result.stage for result in results):
+        stage_results = [result for result in results if result.stage == stage]
+        num_failed = sum(result.error is not None for result in stage_results)
+        print(f"{stage}: {len(stage_results)} files, {num_failed} failed, {sum(result.seconds for result in stage_results):.2f} s total time", file=file)
+
+
+
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Load every catalogued MESA history and example profile ahead of time.")
+    parser.add_argument("--processes", action="store_true", help="parse on a process pool instead of a thread pool")
+    parser.add_argument("--workers", type=int, default=None, help="number of threads/processes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = warm_up(max_workers=args.workers, use_processes=args.processes)
+    print_report(results)
+    print(f"Wall time: {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,126 @@
+import asyncio
+import concurrent.futures
+import gc
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src import load_data
+from src.data import file_paths
+from src.mesa_io import prefetch
+from src.mesa_io import profile_cache
+
+
+
+
+
+# Every way main.py gets at a profile should parse it once: the cache is keyed on (folder, model number) alone,
+# so the history it is loaded with, the form of the folder path, and the route it is loaded through don't matter.
+# The bundled 0.2 Msun run is used as is, from the repository root like the app.
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MESA_FOLDER_PATH = file_paths.MESA_data_folder / "M=0.2" # As in catalogue.json (model.MESA_folder_path)
+BROWSER_PATH = str(MESA_FOLDER_PATH) # As in the file browser table (history_browser.value[0]['path'])
+
+
+
+
+
+# A fresh, empty PROFILE_CACHE (and a prefetcher that fills it) for each test
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+    cache = profile_cache.ProfileCache()
+    prefetcher = prefetch.Prefetcher(cache, max_workers=2)
+    monkeypatch.setattr(load_data, "PROFILE_CACHE", cache)
+    monkeypatch.setattr(load_data, "PROFILE_PREFETCHER", prefetcher)
+    load_data._profile_pair.cache_clear()
+    yield cache
+    prefetcher.shutdown()
+    load_data._profile_pair.cache_clear()
+
+
+
+@pytest.fixture
+def history(cache): # After cache, so the working directory is already the repository root
+    return load_data.load_history(MESA_FOLDER_PATH)
+
+
+
+# Wait for the background loads queued by prefetch_neighboring_profiles
+def wait_for_prefetch():
+    concurrent.futures.wait(list(load_data.PROFILE_PREFETCHER._pending.values()))
+
+
+
+
+
+# Catalogue mode: the selected stage's example profile, loaded with its history
+def test_catalogue_profile_parsed_once(cache, history):
+    modelnum = int(history.model_numbers_available[3])
+    for _ in range(3):
+        profile = asyncio.run(load_data.load_profile_async(MESA_FOLDER_PATH, modelnum, history))
+        profile.logT
+    assert cache.stats.misses == 1
+
+
+
+# Free mode: the same profile picked from the file browser (the path as a string), after it was shown in catalogue mode,
+# and loaded without a history (as warmup.py does), all share one parse
+def test_free_mode_profile_parsed_once(cache, history):
+    modelnum = int(history.model_numbers_available[3])
+    asyncio.run(load_data.load_profile_async(MESA_FOLDER_PATH, modelnum, history))
+    asyncio.run(load_data.load_profile_async(Path(BROWSER_PATH), modelnum, history))
+    asyncio.run(load_data.load_profile_async(Path(BROWSER_PATH), modelnum))
+    load_data.load_profile(MESA_FOLDER_PATH, modelnum).load()
+    assert cache.stats.misses == 1
+
+
+
+# Stepping through the dropdown: the neighbors loaded in the background are the ones then selected
+def test_prefetched_profiles_parsed_once(cache, history):
+    model_numbers = [int(modelnum) for modelnum in history.model_numbers_available[:5]]
+    for modelnum in model_numbers:
+        asyncio.run(load_data.load_profile_async(MESA_FOLDER_PATH, modelnum, history))
+        load_data.prefetch_neighboring_profiles(Path(BROWSER_PATH), modelnum, history)
+        wait_for_prefetch()
+    assert cache.stats.misses == len(model_numbers) + 1 # Plus the next one, prefetched after the last step
+
+
+
+# Interpolated profiles between saved models load the two saved profiles on either side, once
+def test_virtual_profiles_parsed_once(cache, history):
+    lower, upper = [int(modelnum) for modelnum in history.model_numbers_available[3:5]]
+    asyncio.run(load_data.load_profile_async(MESA_FOLDER_PATH, lower, history))
+    for modelnum in range(lower, upper+1):
+        profile = load_data.load_virtual_profile(Path(BROWSER_PATH), modelnum, history)
+        assert np.all(np.isfinite(profile.logT))
+    assert cache.stats.misses == 2
+
+
+
+# Profiles read from their binary cache (.mesa_cache sidecars) are memory-mapped, and still count against the byte budget
+def test_mapped_profiles_evicted_by_bytes(cache, history):
+    model_numbers = [int(modelnum) for modelnum in history.model_numbers_available]
+    first = load_data.load_profile(MESA_FOLDER_PATH, model_numbers[0]).profile
+    assert isinstance(first._store.columns, np.memmap)
+    cache.max_bytes = 3 * first.nbytes
+    for modelnum in model_numbers[1:]:
+        load_data.load_profile(MESA_FOLDER_PATH, modelnum).logT
+    stats = cache.stats
+    assert stats.evictions > 0
+    assert 0 < stats.nbytes <= cache.max_bytes
+    assert stats.entries <= 3
+
+
+
+# Evicted profiles are let go of, so their memory maps (and file descriptors) are closed, whatever their size
+def test_mapped_profiles_evicted_by_entries(cache, history):
+    cache.max_entries = 4
+    model_numbers = [int(modelnum) for modelnum in history.model_numbers_available]
+    refs = [weakref.ref(load_data.load_profile(MESA_FOLDER_PATH, modelnum).profile) for modelnum in model_numbers]
+    gc.collect()
+    assert cache.stats.entries == 4
+    assert cache.stats.evictions == len(model_numbers) - 4
+    assert sum(ref() is not None for ref in refs[:-4]) == 0